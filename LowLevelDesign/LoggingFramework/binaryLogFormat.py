@@ -0,0 +1,407 @@
+import atexit
+import mmap
+import os
+import struct
+from datetime import datetime
+from threading import Event, Lock, Thread
+
+from loggingFramework import _WALL_CLOCK_OFFSET_NS, LogHandler, LogLevel, LogRecord
+
+# On-disk layout
+#
+#   file    := MAGIC frame*
+#   frame   := tag:u8 length:varint payload[length]
+#
+#   SESSION payload: wall_clock_offset_ns:i64
+#       Starts a new string table. Written each time a writer opens the file
+#       and whenever the table fills up.
+#   STRING  payload: utf-8 bytes
+#       Defines the next string id (0, 1, 2, ...) of the current session.
+#   BLOCK   payload: base_ts:i64 min_ts:i64 max_ts:i64 level_mask:u8 count:u32 record*
+#       A run of records. The reader checks the header against the query and
+#       jumps over the whole block when nothing in it can match.
+#
+#   record  := length:varint level:u8 ts_delta:zigzag name_id:varint
+#              message:value field_count:varint (key_id:varint value)*
+#   value   := tag:u8 body, with ints as zigzag varints, floats as f64 and
+#              strings either interned (id) or inline (length + bytes)
+#
+# Timestamps are monotonic nanoseconds, delta-encoded from the previous record
+# in the block (the first from base_ts). STRING frames always come before
+# the block that uses them, so skipping a block never skips a definition a
+# later block needs.
+MAGIC = b"SLOG\x01"
+SESSION, STRING, BLOCK = 1, 2, 3
+_BLOCK_HEADER = struct.Struct("<qqqBI")
+_OFFSET = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT_TAG, _INTERNED, _INLINE = range(7)
+_LEVELS = {level.value: level for level in LogLevel}
+_LEVEL_NAMES = {level.name: level for level in LogLevel}
+
+
+def _varint(value: int, out: bytearray):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf, pos: int):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def _complete_length(file_name: str) -> int:
+    """Length of file_name up to the end of its last complete frame (0 if there is no valid header)."""
+    try:
+        f = open(file_name, "rb")
+    except FileNotFoundError:
+        return 0
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= len(MAGIC):
+            head = f.read()
+            if not MAGIC.startswith(head):
+                raise ValueError(f"{file_name} is not a binary log")
+            return size if head == MAGIC else 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if buf[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{file_name} is not a binary log")
+            pos = len(MAGIC)
+            while pos < size:
+                if buf[pos] not in (SESSION, STRING, BLOCK):
+                    break
+                try:
+                    length, body = _read_varint(buf, pos + 1)
+                except IndexError:
+                    break
+                if body + length > size:
+                    break
+                pos = body + length
+            return pos
+
+
+# Binary Log Writer
+class BinaryLogWriter:
+    """
+    Appends LogRecords to a file in the format above. Logger names, messages
+    and field keys are interned: each distinct string is written once as a
+    STRING frame and records refer to it by a small integer. String values up
+    to intern_max_length characters are interned too, because most of them
+    are repeated (paths, user ids, status names). Longer values are written
+    inline.
+
+    Records are buffered into blocks of about block_size bytes. A crash loses
+    at most the unflushed block. A frame torn by a crash is truncated away
+    when the file is opened again, so new records are not written behind it.
+    """
+    def __init__(self, file_name: str, block_size: int = 64 * 1024, max_strings: int = 65536,
+                 intern_max_length: int = 32):
+        self.file_name = file_name
+        self.block_size = block_size
+        self.max_strings = max_strings
+        self.intern_max_length = intern_max_length
+        self.lock = Lock()
+        complete = _complete_length(file_name)
+        self.file = open(file_name, "ab")
+        if self.file.tell() != complete:
+            self.file.truncate(complete)
+        if complete == 0:
+            self.file.write(MAGIC)
+        self.pending = bytearray()  # STRING frames for the current block
+        self.block = bytearray()
+        self.scratch = bytearray()
+        self._start_session()
+
+    def _start_session(self):
+        self.strings = {}
+        self.pending += bytes((SESSION,))
+        _varint(_OFFSET.size, self.pending)
+        self.pending += _OFFSET.pack(_WALL_CLOCK_OFFSET_NS)
+        self._reset_block()
+
+    def _reset_block(self):
+        self.block.clear()
+        self.base_ts = self.last_ts = None
+        self.min_ts = self.max_ts = None
+        self.level_mask = 0
+        self.count = 0
+
+    def _intern(self, text: str) -> int:
+        string_id = self.strings.get(text)
+        if string_id is None:
+            string_id = self.strings[text] = len(self.strings)
+            data = text.encode()
+            self.pending.append(STRING)
+            _varint(len(data), self.pending)
+            self.pending += data
+        return string_id
+
+    def _value(self, value, out: bytearray):
+        if value is None:
+            out.append(_NONE)
+        elif value is True or value is False:
+            out.append(_TRUE if value else _FALSE)
+        elif isinstance(value, int):
+            out.append(_INT)
+            _varint(_zigzag(value), out)
+        elif isinstance(value, float):
+            out.append(_FLOAT_TAG)
+            out += _FLOAT.pack(value)
+        else:
+            value = str(value)
+            if len(value) <= self.intern_max_length:
+                out.append(_INTERNED)
+                _varint(self._intern(value), out)
+            else:
+                data = value.encode()
+                out.append(_INLINE)
+                _varint(len(data), out)
+                out += data
+
+    def write(self, record: LogRecord):
+        with self.lock:
+            if len(self.strings) >= self.max_strings:
+                self._flush_locked()
+                self._start_session()
+            body = self.scratch
+            body.clear()
+            ts = record.timestamp_ns
+            if self.base_ts is None:
+                self.base_ts = self.last_ts = self.min_ts = self.max_ts = ts
+            # Threads can hand records over slightly out of order, so the
+            # delta is signed and the block keeps its real min/max
+            body.append(record.level.value)
+            _varint(_zigzag(ts - self.last_ts), body)
+            self.last_ts = ts
+            if ts < self.min_ts:
+                self.min_ts = ts
+            elif ts > self.max_ts:
+                self.max_ts = ts
+            self.level_mask |= 1 << record.level.value
+            self.count += 1
+            _varint(self._intern(record.name), body)
+            self._value(record.message, body)
+            _varint(len(record.fields), body)
+            for key, value in record.fields.items():
+                _varint(self._intern(key), body)
+                self._value(value, body)
+            # The length prefix lets the reader step over a record it rejects
+            # on level or time without decoding the rest of it
+            _varint(len(body), self.block)
+            self.block += body
+            if len(self.block) >= self.block_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self._flush_locked()
+                self.file.close()
+
+    def _flush_locked(self):
+        out = self.pending
+        if self.count:
+            out.append(BLOCK)
+            _varint(_BLOCK_HEADER.size + len(self.block), out)
+            out += _BLOCK_HEADER.pack(self.base_ts, self.min_ts, self.max_ts, self.level_mask, self.count)
+            out += self.block
+        if out:
+            self.file.write(out)
+            self.file.flush()
+            out.clear()
+        self._reset_block()
+
+
+# Binary Log Handler
+class BinaryLogHandler(LogHandler):
+    """
+    Handler that stores structured records with BinaryLogWriter. Plain text
+    lines from Logger.log() are stored as records from the "text" logger,
+    with the level parsed from the line and the timestamp prefix dropped.
+    Blocks are also flushed every flush_interval seconds and on close(),
+    which runs at interpreter exit.
+    """
+    def __init__(self, file_name: str, flush_interval: float = 1.0, **writer_options):
+        self.writer = BinaryLogWriter(file_name, **writer_options)
+        self.flush_interval = flush_interval
+        self._stop = Event()
+        self._flusher = Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def write(self, message: str):
+        # "[YYYY-mm-dd HH:MM:SS] [LEVEL] message" as rendered by Logger
+        level = LogLevel.INFO
+        if message[21:23] == " [":
+            close = message.find("] ", 23)
+            parsed = _LEVEL_NAMES.get(message[23:close]) if close > 0 else None
+            if parsed is not None:
+                level, message = parsed, message[close + 2:]
+        self.writer.write(LogRecord(level, message, "text"))
+
+    def write_record(self, record: LogRecord):
+        self.writer.write(record)
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self._stop.set()
+        self.writer.close()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            self.writer.flush()
+
+
+# Binary Log Reader
+class BinaryLogReader:
+    """
+    Memory-maps a binary log and yields the LogRecords that match a query.
+    Blocks whose time range or level mask cannot match are skipped with a
+    single jump, and records inside a candidate block are only fully decoded
+    once their level and timestamp match.
+    """
+    def __init__(self, file_name: str):
+        self.file = open(file_name, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self.map[:len(MAGIC)] not in (MAGIC, b""):
+            raise ValueError(f"{file_name} is not a binary log")
+        self.blocks_read = self.blocks_skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    @staticmethod
+    def _wall_ns(moment):
+        if moment is None:
+            return None
+        if isinstance(moment, datetime):
+            moment = moment.timestamp()
+        return int(moment * 1e9)
+
+    def records(self, min_level: LogLevel = None, start=None, end=None, name: str = None):
+        """
+        Yield records with level >= min_level and start <= wall time < end.
+        start and end are datetimes or epoch seconds; name keeps one logger.
+        """
+        buf = self.map
+        size = len(buf)
+        min_value = min_level.value if min_level else 0
+        wanted_mask = sum(1 << value for value in _LEVELS if value >= min_value)
+        start_ns, end_ns = self._wall_ns(start), self._wall_ns(end)
+        strings = []
+        low = high = None
+        pos = len(MAGIC)
+        while pos < size:
+            try:
+                tag = buf[pos]
+                length, body = _read_varint(buf, pos + 1)
+            except IndexError:  # torn frame header at the tail
+                return
+            pos = body + length
+            if pos > size:  # torn write at the tail
+                return
+            if tag == STRING:
+                strings.append(buf[body:pos].decode())
+            elif tag == SESSION:
+                offset = _OFFSET.unpack_from(buf, body)[0]
+                strings = []
+                # Query bounds in this session's monotonic clock
+                low = start_ns - offset if start_ns is not None else None
+                high = end_ns - offset if end_ns is not None else None
+            elif tag == BLOCK:
+                base_ts, min_ts, max_ts, level_mask, count = _BLOCK_HEADER.unpack_from(buf, body)
+                if not level_mask & wanted_mask or (low is not None and max_ts < low) or \
+                        (high is not None and min_ts >= high):
+                    self.blocks_skipped += 1
+                    continue
+                self.blocks_read += 1
+                yield from self._block_records(buf, body + _BLOCK_HEADER.size, count, base_ts, strings,
+                                               min_value, low, high, name)
+
+    def _block_records(self, buf, pos, count, ts, strings, min_value, low, high, name):
+        for _ in range(count):
+            length, pos = _read_varint(buf, pos)
+            end = pos + length
+            level_value = buf[pos]
+            delta, pos = _read_varint(buf, pos + 1)
+            ts += _unzigzag(delta)
+            if level_value < min_value or (low is not None and ts < low) or (high is not None and ts >= high):
+                pos = end
+                continue
+            name_id, pos = _read_varint(buf, pos)
+            if name is not None and strings[name_id] != name:
+                pos = end
+                continue
+            message, pos = self._read_value(buf, pos, strings)
+            field_count, pos = _read_varint(buf, pos)
+            fields = {}
+            for _ in range(field_count):
+                key_id, pos = _read_varint(buf, pos)
+                fields[strings[key_id]], pos = self._read_value(buf, pos, strings)
+            yield LogRecord(_LEVELS[level_value], message, strings[name_id], fields, ts)
+
+    @staticmethod
+    def _read_value(buf, pos, strings):
+        tag = buf[pos]
+        pos += 1
+        if tag == _INTERNED:
+            string_id, pos = _read_varint(buf, pos)
+            return strings[string_id], pos
+        if tag == _INT:
+            value, pos = _read_varint(buf, pos)
+            return _unzigzag(value), pos
+        if tag == _FLOAT_TAG:
+            return _FLOAT.unpack_from(buf, pos)[0], pos + _FLOAT.size
+        if tag == _INLINE:
+            length, pos = _read_varint(buf, pos)
+            return buf[pos:pos + length].decode(), pos + length
+        return (None, False, True)[tag], pos
+
+
+if __name__ == "__main__":
+    import tempfile
+    from loggingFramework import ConsoleHandler, Logger
+
+    path = os.path.join(tempfile.mkdtemp(), "app.slog")
+    handler = BinaryLogHandler(path)
+    logger = Logger(level=LogLevel.DEBUG, handlers=[ConsoleHandler(), handler], in_process=True)
+    logger.log_structured(LogLevel.INFO, "request handled", name="api", path="/orders", status=200, ms=12.5)
+    logger.log_structured(LogLevel.ERROR, "payment failed", name="billing", order_id=1042, retry=False)
+    logger.log(LogLevel.WARNING, "plain text message")
+    logger.flush()
+    handler.flush()
+    with BinaryLogReader(path) as reader:
+        for record in reader.records(min_level=LogLevel.WARNING):
+            print("query:", record.format())
@@ -0,0 +1,431 @@
+import bisect
+import glob
+import heapq
+import json
+import mmap
+import os
+import re
+from array import array
+from datetime import datetime
+from threading import Event, Lock, Thread
+
+from loggingFramework import LogLevel
+
+_TOKEN = re.compile(rb"\w+")
+_OFFSET_BITS = 40  # a posting is segment_id << 40 | byte offset of the line
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+_FINGERPRINT_BYTES = 1024  # head of a segment, to tell a reused inode from the indexed file
+
+
+def _level_token(level: LogLevel) -> str:
+    return f"level:{level.name.lower()}"
+
+
+def _gallop(values, target, lo):
+    """Index of the first element >= target in sorted values, searching forward from lo."""
+    step = 1
+    hi = lo
+    while hi < len(values) and values[hi] < target:
+        lo = hi + 1
+        hi += step
+        step <<= 1
+    return bisect.bisect_left(values, target, lo, min(hi, len(values)))
+
+
+def _in_any(candidates, group):
+    """The sorted candidates that appear in at least one sorted array of group."""
+    positions = [0] * len(group)
+    for candidate in candidates:
+        for i, values in enumerate(group):
+            position = positions[i] = _gallop(values, candidate, positions[i])
+            if position < len(values) and values[position] == candidate:
+                yield candidate
+                break
+
+
+def _union(group):
+    """Merge sorted arrays into one sorted stream without duplicates."""
+    previous = None
+    for value in heapq.merge(*group):
+        if value != previous:
+            yield value
+            previous = value
+
+
+# Log Indexer
+class LogIndexer:
+    """
+    Incrementally indexes the files written by FileHandler / BufferedFileHandler
+    (lines of "[YYYY-mm-dd HH:MM:SS] [LEVEL] message") into index_dir, and
+    answers term, level and time-window queries from the index.
+
+    Segments are the live file plus its rotated copies. They are tracked by
+    inode, so a segment keeps its id when rotation renames it and indexing
+    resumes where it stopped. A file that is shorter than what was indexed,
+    or whose first bytes changed, is a new file on a reused inode (or a
+    truncated one): the old segment is retired and the file indexed afresh.
+    Gzipped segments cannot be memory-mapped and
+    are treated as gone, so use compress=False on the handler to keep
+    rotated segments searchable.
+
+    On disk:
+        index.json      segments (id, inode, path, bytes indexed, time index)
+                        and the list of runs
+        run-N.post      postings: sorted uint64 arrays, one per token
+        run-N.terms     JSON token -> [first posting, count] in run-N.post
+    Each refresh() writes new runs; when there are more than max_runs they
+    are merged into one. The time index keeps, per segment, the offset of
+    the first line of every second, so a time window becomes a byte range.
+    """
+    def __init__(self, log_file: str, index_dir: str, max_runs: int = 8, chunk_bytes: int = 64 * 1024 * 1024):
+        self.log_file = log_file
+        self.index_dir = index_dir
+        self.max_runs = max_runs
+        self.chunk_bytes = chunk_bytes
+        self.lock = Lock()
+        os.makedirs(index_dir, exist_ok=True)
+        self.segments = {}
+        self.runs = []
+        self.next_run = 0
+        state_path = os.path.join(index_dir, "index.json")
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+            self.segments = {segment["id"]: segment for segment in state["segments"]}
+            self.next_run = state["next_run"]
+            self.runs = [self._open_run(name) for name in state["runs"]]
+        self._maps = {}
+        self._stop = Event()
+        self._tailer = None
+
+    # Persistence
+    def _open_run(self, name):
+        with open(os.path.join(self.index_dir, name + ".terms")) as f:
+            terms = json.load(f)
+        postings_file = open(os.path.join(self.index_dir, name + ".post"), "rb")
+        size = os.fstat(postings_file.fileno()).st_size
+        postings = mmap.mmap(postings_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        postings_file.close()
+        return name, terms, postings
+
+    def _write_run(self, postings):
+        name = f"run-{self.next_run:06d}"
+        self.next_run += 1
+        terms = {}
+        position = 0
+        with open(os.path.join(self.index_dir, name + ".post"), "wb") as f:
+            for token in sorted(postings):
+                values = array("Q", sorted(postings[token]))
+                values.tofile(f)
+                terms[token.decode(errors="replace")] = [position, len(values)]
+                position += len(values)
+        with open(os.path.join(self.index_dir, name + ".terms"), "w") as f:
+            json.dump(terms, f)
+        return name
+
+    def _save_state(self):
+        state = {"segments": list(self.segments.values()), "runs": [run[0] for run in self.runs],
+                 "next_run": self.next_run}
+        path = os.path.join(self.index_dir, "index.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f)
+        # The state only ever points at runs that are fully written
+        os.replace(path + ".tmp", path)
+
+    # Indexing
+    def _discover(self):
+        """Match the files on disk to live segments by inode."""
+        # Pruned segments are out: the OS may have given their inode to a new file
+        by_inode = {segment["inode"]: segment for segment in self.segments.values() if segment["path"] is not None}
+        live_paths = {}
+        candidates = [path for path in glob.glob(glob.escape(self.log_file) + ".*")
+                      if not path.endswith(".gz")] + [self.log_file]
+        for path in candidates:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            inode = stat.st_ino
+            segment = by_inode.get(inode)
+            if segment is not None and not self._same_file(segment, path, stat.st_size):
+                # Retired: its postings stop matching and compaction drops them
+                segment = None
+            if segment is None:
+                segment_id = max(self.segments, default=-1) + 1
+                segment = {"id": segment_id, "inode": inode, "path": path, "indexed": 0, "times": []}
+                self.segments[segment_id] = segment
+                by_inode[inode] = segment
+            live_paths[segment["id"]] = path
+        for segment in self.segments.values():
+            path = live_paths.get(segment["id"])
+            if path != segment["path"]:
+                self._maps.pop(segment["id"], None)
+            segment["path"] = path  # None once pruned, compressed or retired
+
+    @staticmethod
+    def _same_file(segment, path, size):
+        if size < segment["indexed"]:
+            return False
+        fingerprint = bytes.fromhex(segment.get("head", ""))
+        if not fingerprint:
+            return True
+        try:
+            with open(path, "rb") as f:
+                return f.read(len(fingerprint)) == fingerprint
+        except FileNotFoundError:
+            return False
+
+    def refresh(self):
+        """Index whatever was appended since the last refresh; returns the number of new lines."""
+        with self.lock:
+            self._discover()
+            new_lines = 0
+            postings = {}
+            pending_bytes = 0
+            for segment in sorted(self.segments.values(), key=lambda segment: segment["id"]):
+                if segment["path"] is None:
+                    continue
+                with open(segment["path"], "rb") as f:
+                    f.seek(segment["indexed"])
+                    while True:
+                        chunk = f.read(self.chunk_bytes)
+                        end = chunk.rfind(b"\n") + 1
+                        if not end:
+                            break  # only a partial line so far
+                        new_lines += self._index_chunk(segment, chunk[:end], postings)
+                        segment["indexed"] += end
+                        f.seek(segment["indexed"])
+                        pending_bytes += end
+                        if pending_bytes >= self.chunk_bytes:
+                            self.runs.append(self._open_run(self._write_run(postings)))
+                            postings, pending_bytes = {}, 0
+                    if len(segment.get("head", "")) < 2 * _FINGERPRINT_BYTES and segment["indexed"]:
+                        f.seek(0)
+                        segment["head"] = f.read(min(_FINGERPRINT_BYTES, segment["indexed"])).hex()
+            if postings:
+                self.runs.append(self._open_run(self._write_run(postings)))
+            if len(self.runs) > self.max_runs:
+                self._compact_locked()
+            self._save_state()
+            return new_lines
+
+    def _index_chunk(self, segment, chunk, postings):
+        base = (segment["id"] << _OFFSET_BITS) | segment["indexed"]
+        times = segment["times"]
+        last_second = times[-1][0] if times else None
+        parsed = {}  # b"YYYY-mm-dd HH:MM:SS" -> epoch second
+        position = lines = 0
+        while position < len(chunk):
+            end = chunk.index(b"\n", position)
+            line = chunk[position:end]
+            stamp = line[1:20]
+            second = parsed.get(stamp)
+            if second is None:
+                try:
+                    second = int(datetime.strptime(stamp.decode(), "%Y-%m-%d %H:%M:%S").timestamp())
+                except ValueError:
+                    second = last_second or 0
+                parsed[stamp] = second
+            # Threads can write a line stamped a second earlier than the one
+            # before it; the time index only ever moves forward
+            if last_second is None or second > last_second:
+                times.append([second, segment["indexed"] + position])
+                last_second = second
+            posting = base + position
+            lowered = line.lower()
+            for token in set(_TOKEN.findall(lowered, 22)):
+                entries = postings.get(token)
+                if entries is None:
+                    entries = postings[token] = array("Q")
+                entries.append(posting)
+            level_end = lowered.find(b"]", 22)
+            if level_end > 0:
+                postings.setdefault(b"level:" + lowered[23:level_end], array("Q")).append(posting)
+            position = end + 1
+            lines += 1
+        return lines
+
+    def compact(self):
+        with self.lock:
+            self._compact_locked()
+            self._save_state()
+
+    def _compact_locked(self):
+        """Merge every run into one and drop postings of segments that are gone."""
+        live = {segment_id for segment_id, segment in self.segments.items() if segment["path"] is not None}
+        merged = {}
+        for _, terms, _ in self.runs:
+            for token in terms:
+                if token.encode() not in merged:
+                    merged[token.encode()] = [posting for posting in self._postings(token)
+                                     if posting >> _OFFSET_BITS in live]
+        old = self.runs
+        self.runs = [self._open_run(self._write_run({token: values for token, values in merged.items() if values}))]
+        # No postings point at gone segments any more, so forget them
+        self.segments = {segment_id: segment for segment_id, segment in self.segments.items() if segment_id in live}
+        self._save_state()
+        for name, _, postings in old:
+            if isinstance(postings, mmap.mmap):
+                postings.close()
+            for suffix in (".post", ".terms"):
+                os.remove(os.path.join(self.index_dir, name + suffix))
+
+    # Tailing
+    def start(self, interval: float = 1.0):
+        """Refresh from a background thread every interval seconds."""
+        self._stop.clear()
+        self._tailer = Thread(target=self._tail, args=(interval,), daemon=True)
+        self._tailer.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._tailer:
+            self._tailer.join()
+
+    def _tail(self, interval):
+        while not self._stop.wait(interval):
+            self.refresh()
+
+    # Queries
+    def _postings(self, token):
+        """Sorted postings of token across every run."""
+        values = array("Q")
+        ordered = True
+        for _, terms, postings in self.runs:
+            entry = terms.get(token)
+            if entry:
+                start, count = entry
+                boundary = len(values)
+                values.frombytes(postings[start * 8:(start + count) * 8])
+                if boundary and count and values[boundary - 1] > values[boundary]:
+                    ordered = False
+        # Runs are written in indexing order, so they normally just concatenate
+        return values if ordered else array("Q", sorted(values))
+
+    def _segment_map(self, segment_id):
+        mapped = self._maps.get(segment_id)
+        if mapped is None:
+            with open(self.segments[segment_id]["path"], "rb") as f:
+                mapped = self._maps[segment_id] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        elif len(mapped) < self.segments[segment_id]["indexed"]:
+            # The file grew since it was mapped
+            mapped.close()
+            del self._maps[segment_id]
+            return self._segment_map(segment_id)
+        return mapped
+
+    def _time_range(self, segment, start, end):
+        """Byte range [first, last) of the segment's lines in [start, end) epoch seconds."""
+        times = segment["times"]
+        first = 0
+        if start is not None:
+            index = bisect.bisect_left(times, start, key=lambda entry: entry[0])
+            first = times[index][1] if index < len(times) else segment["indexed"]
+        last = segment["indexed"]
+        if end is not None:
+            index = bisect.bisect_left(times, end, key=lambda entry: entry[0])
+            last = times[index][1] if index < len(times) else segment["indexed"]
+        return first, last
+
+    @staticmethod
+    def _epoch(moment):
+        if moment is None or isinstance(moment, (int, float)):
+            return moment
+        return moment.timestamp()
+
+    def query(self, all_terms=(), any_terms=(), min_level: LogLevel = None, start=None, end=None, limit: int = None):
+        """
+        Return (path, offset, line) for indexed lines that contain every term
+        in all_terms and at least one in any_terms (when given), whose level
+        is at least min_level, and whose timestamp is in [start, end).
+        start and end are datetimes or epoch seconds. Terms match whole
+        words, case-insensitively. Results are in file order, oldest segment
+        first. Only the matching lines are read, through mmap.
+        """
+        with self.lock:
+            # Posting lists are sorted, so they are intersected with galloping
+            # searches and merged lazily, never materialized as sets
+            required = sorted((self._postings(term.lower()) for term in all_terms), key=len)
+            if any(not values for values in required):
+                return []
+            groups = []  # each group: a line must be in at least one of its arrays
+            if any_terms:
+                groups.append([self._postings(term.lower()) for term in any_terms])
+            if min_level is not None:
+                groups.append([self._postings(_level_token(level)) for level in LogLevel
+                               if level.value >= min_level.value])
+            groups.sort(key=lambda group: sum(map(len, group)))
+
+            start, end = self._epoch(start), self._epoch(end)
+            ranges = {segment_id: self._time_range(segment, start, end)
+                      for segment_id, segment in self.segments.items() if segment["path"] is not None}
+            if required:
+                # Drive with the rarest term and probe the others
+                candidates = iter(required[0])
+                for values in required[1:]:
+                    candidates = _in_any(candidates, [values])
+            elif groups:
+                candidates = _union(groups.pop(0))
+            else:
+                # Time window only: every line in the matching byte ranges
+                return self._scan_ranges(ranges, limit)
+            for group in groups:
+                candidates = _in_any(candidates, group)
+
+            results = []
+            for posting in candidates:
+                segment_id, offset = posting >> _OFFSET_BITS, posting & _OFFSET_MASK
+                byte_range = ranges.get(segment_id)
+                if byte_range is None or not byte_range[0] <= offset < byte_range[1]:
+                    continue
+                mapped = self._segment_map(segment_id)
+                line_end = mapped.find(b"\n", offset)
+                results.append((self.segments[segment_id]["path"], offset, mapped[offset:line_end].decode(errors="replace")))
+                if limit is not None and len(results) >= limit:
+                    break
+            return results
+
+    def _scan_ranges(self, ranges, limit):
+        results = []
+        for segment_id in sorted(ranges):
+            first, last = ranges[segment_id]
+            if first >= last:
+                continue
+            mapped = self._segment_map(segment_id)
+            offset = first
+            while offset < last:
+                line_end = mapped.find(b"\n", offset)
+                results.append((self.segments[segment_id]["path"], offset, mapped[offset:line_end].decode(errors="replace")))
+                if limit is not None and len(results) >= limit:
+                    return results
+                offset = line_end + 1
+        return results
+
+    def close(self):
+        self.stop()
+        with self.lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            for _, _, postings in self.runs:
+                if isinstance(postings, mmap.mmap):
+                    postings.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from loggingFramework import FileHandler, Logger
+
+    directory = tempfile.mkdtemp()
+    log_file = os.path.join(directory, "app.log")
+    logger = Logger(level=LogLevel.DEBUG, handlers=[FileHandler(log_file)])
+    logger.log(LogLevel.INFO, "user alice logged in")
+    logger.log(LogLevel.ERROR, "payment failed for user alice")
+    logger.log(LogLevel.WARNING, "payment retry for user bob")
+
+    indexer = LogIndexer(log_file, os.path.join(directory, "index"))
+    print("Indexed lines:", indexer.refresh())
+    for path, offset, line in indexer.query(all_terms=["payment"], any_terms=["alice", "carol"]):
+        print(f"{os.path.basename(path)}@{offset}: {line}")
+    print("Errors:", [line for _, _, line in indexer.query(min_level=LogLevel.ERROR)])
+    indexer.close()
@@ -0,0 +1,446 @@
+import glob
+import importlib.util
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from binaryLogFormat import BinaryLogReader, BinaryLogWriter
+from logIndexer import LogIndexer
+from sharedMemoryTransport import SharedMemoryLogTransport
+from loggingFramework import (
+    AsyncLogHandler, BufferedFileHandler, DedupFilter, FileHandler, HandlerDispatcher, LocalLock, LogHandler,
+    Logger, LogLevel,
+    LogRecord, OverflowPolicy, RateLimitFilter, RedisLock, SamplingFilter,
+)
+
+
+# In-process stand-in for Redis: SET NX EX / DELETE with a simulated round-trip
+class FakeRedis:
+    def __init__(self, round_trip=0.0001):
+        self.round_trip = round_trip
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def _network(self):
+        if self.round_trip:
+            time.sleep(self.round_trip)
+
+    def set(self, key, value, ex=None, nx=False):
+        self._network()
+        with self.lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value
+            return True
+
+    def delete(self, key):
+        self._network()
+        with self.lock:
+            self.data.pop(key, None)
+
+
+class CountingHandler(LogHandler):
+    def __init__(self):
+        self.count = 0
+
+    def write(self, message: str):
+        self.count += 1
+
+
+def _fresh_logger(**kwargs):
+    # Logger is a singleton; reset it so each run gets its own configuration
+    Logger._instance = None
+    handler = CountingHandler()
+    return Logger(level=LogLevel.INFO, handlers=[handler], **kwargs), handler
+
+
+def _run(logger, threads, messages_per_thread):
+    def worker(worker_id):
+        for i in range(messages_per_thread):
+            logger.log(LogLevel.INFO, f"worker {worker_id} message {i}")
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    logger.flush()
+    return time.perf_counter() - start
+
+
+def benchmark_in_process(thread_counts=(1, 4), messages_per_thread=2_000):
+    """Messages/sec through the Redis-locked path vs the local lock and the in-process queue, with a fake local Redis."""
+    print(f"{'threads':>8} {'mode':>11} {'msgs/s':>10} {'delivered':>10}")
+    for threads in thread_counts:
+        for mode, backend, kwargs in (("redis lock", RedisLock("logger_lock", client=FakeRedis()), {}),
+                                      ("local lock", LocalLock(), {}),
+                                      ("in-process", None, {"in_process": True})):
+            Logger.set_lock_backend(backend)
+            logger, handler = _fresh_logger(**kwargs)
+            elapsed = _run(logger, threads, messages_per_thread)
+            sent = threads * messages_per_thread
+            print(f"{threads:>8} {mode:>11} {sent / elapsed:>10,.0f} {handler.count / sent:>9.0%}")
+
+
+def benchmark_file_handlers(lines=200_000):
+    """Lines/sec written by the open-per-line FileHandler vs BufferedFileHandler, plus rotation."""
+    message = "[2024-01-01 12:00:00] [INFO] request handled in 12 ms path=/api/orders status=200"
+    with tempfile.TemporaryDirectory() as directory:
+        for name, handler in (("FileHandler", FileHandler(os.path.join(directory, "plain.log"))),
+                              ("Buffered", BufferedFileHandler(os.path.join(directory, "buffered.log"))),
+                              ("Buffered+rotate", BufferedFileHandler(os.path.join(directory, "rotated.log"),
+                                                                     max_bytes=2 * 1024 * 1024, backup_count=3))):
+            start = time.perf_counter()
+            for _ in range(lines):
+                handler.write(message)
+            if isinstance(handler, BufferedFileHandler):
+                handler.close()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>16}: {lines / elapsed:>10,.0f} lines/s")
+        segments = sorted(os.path.basename(path) for path in glob.glob(os.path.join(directory, "rotated.log.*")))
+        print(f"rotated segments kept: {len(segments)} ({', '.join(segment.rsplit('.', 1)[-1] for segment in segments)})")
+
+
+class SlowHandler(CountingHandler):
+    """Downstream sink that costs a fixed amount per batch, like a congested disk."""
+    def __init__(self, delay_per_batch=0.002):
+        super().__init__()
+        self.delay_per_batch = delay_per_batch
+
+    def write_batch(self, messages):
+        time.sleep(self.delay_per_batch)
+        self.count += len(messages)
+
+
+def benchmark_async_overflow(burst=200_000, capacity=8_192):
+    """A burst into a slow sink under each overflow policy: caller time, drops and peak depth."""
+    print(f"{'policy':>12} {'caller (ms)':>12} {'delivered':>10} {'dropped':>9} {'max depth':>10}")
+    for policy in OverflowPolicy:
+        sink = SlowHandler()
+        handler = AsyncLogHandler(handlers=[sink], capacity=capacity, overflow_policy=policy)
+        start = time.perf_counter()
+        for i in range(burst):
+            handler.write(f"burst record {i}")
+        caller_ms = (time.perf_counter() - start) * 1e3
+        handler.close()
+        print(f"{policy.value:>12} {caller_ms:>12.1f} {sink.count:>10,} {handler.dropped:>9,} {handler.max_depth:>10,}")
+        assert sink.count + handler.dropped == burst
+
+
+def benchmark_lazy_formatting(calls=500_000):
+    """Cost of debug calls left in a hot loop at INFO level, and of the timestamp prefix."""
+    logger, _ = _fresh_logger(in_process=True)
+    payload = {"user": 42, "items": list(range(10))}
+
+    def timed(label, body):
+        start = time.perf_counter()
+        body()
+        print(f"{label:>34}: {(time.perf_counter() - start) / calls * 1e9:8.0f} ns/call")
+
+    def eager():
+        for i in range(calls):
+            logger.log(LogLevel.DEBUG, f"iteration {i} payload {payload}")
+
+    def lazy():
+        for i in range(calls):
+            logger.log(LogLevel.DEBUG, "iteration %d payload %s", i, payload)
+
+    def guarded():
+        for i in range(calls):
+            if logger.is_enabled_for(LogLevel.DEBUG):
+                logger.log(LogLevel.DEBUG, "iteration %d payload %s", i, payload)
+
+    def strftime_each_call():
+        for _ in range(calls):
+            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] "
+
+    def cached_prefix():
+        for _ in range(calls):
+            logger._timestamp_prefix()
+
+    timed("disabled, eager f-string", eager)
+    timed("disabled, lazy %-args", lazy)
+    timed("disabled, is_enabled_for guard", guarded)
+    timed("timestamp via strftime per call", strftime_each_call)
+    timed("timestamp via per-second cache", cached_prefix)
+
+
+def benchmark_binary_format(records=300_000):
+    """Bytes per record as text vs binary, and a level + time-window query over each file."""
+    levels = [LogLevel.INFO] * 90 + [LogLevel.DEBUG] * 7 + [LogLevel.WARNING] * 2 + [LogLevel.ERROR]
+    paths = ["/api/orders", "/api/users", "/api/cart", "/health"]
+    start_ns = time.monotonic_ns()
+    step_ns = 3_600 * 10**9 // records  # one hour of traffic
+    with tempfile.TemporaryDirectory() as directory:
+        text_path, binary_path = os.path.join(directory, "app.log"), os.path.join(directory, "app.slog")
+        writer = BinaryLogWriter(binary_path)
+        begin = time.perf_counter()
+        with open(text_path, "w") as text_file:
+            for i in range(records):
+                record = LogRecord(levels[i % len(levels)], "request handled", "api",
+                                   {"path": paths[i % len(paths)], "status": 200, "user_id": i % 5_000,
+                                    "latency_ms": (i % 97) / 4},
+                                   timestamp_ns=start_ns + i * step_ns)
+                writer.write(record)
+                text_file.write(record.format() + "\n")
+        writer.close()
+        print(f"encode (text + binary): {records / (time.perf_counter() - begin):,.0f} records/s")
+        text_size, binary_size = os.path.getsize(text_path), os.path.getsize(binary_path)
+        print(f"text:   {text_size / records:6.1f} B/record")
+        print(f"binary: {binary_size / records:6.1f} B/record ({text_size / binary_size:.1f}x smaller)")
+
+        # Errors in the last six minutes. Text timestamps only have whole
+        # seconds, so the window starts on one for both queries to agree
+        window_start = LogRecord(LogLevel.INFO, "", timestamp_ns=start_ns + records * step_ns * 9 // 10).wall_time()
+        window_start = window_start.replace(microsecond=0)
+        begin = time.perf_counter()
+        text_hits = 0
+        cutoff = window_start.strftime("%Y-%m-%d %H:%M:%S")
+        with open(text_path) as text_file:
+            for line in text_file:
+                if line[1:20] >= cutoff and line[23:].startswith(("ERROR", "FATAL")):
+                    text_hits += 1
+        text_ms = (time.perf_counter() - begin) * 1e3
+        begin = time.perf_counter()
+        with BinaryLogReader(binary_path) as reader:
+            binary_hits = sum(1 for _ in reader.records(min_level=LogLevel.ERROR, start=window_start))
+            skipped, read = reader.blocks_skipped, reader.blocks_read
+        binary_ms = (time.perf_counter() - begin) * 1e3
+        print(f"query ERROR+ in last 10%: text scan {text_ms:.0f} ms ({text_hits} hits), "
+              f"binary {binary_ms:.0f} ms ({binary_hits} hits, {skipped}/{skipped + read} blocks skipped)")
+        assert text_hits == binary_hits, f"text scan found {text_hits} hits, binary query {binary_hits}"
+
+
+def _counting_handlers():
+    return [CountingHandler()]
+
+
+def _ring_producer(handler, count):
+    for i in range(count):
+        handler.write(f"[2024-01-01 12:00:00] [INFO] worker request {i} handled")
+
+
+def _queue_producer(queue, count):
+    for i in range(count):
+        queue.put(f"[2024-01-01 12:00:00] [INFO] worker request {i} handled")
+
+
+def _queue_collector(queue, producers):
+    handler = CountingHandler()
+    finished = 0
+    while finished < producers:
+        message = queue.get()
+        if message is None:
+            finished += 1
+        else:
+            handler.write(message)
+
+
+def benchmark_shared_memory(producer_counts=(1, 2, 4), messages_per_producer=100_000):
+    """Messages/sec from N producer processes to one collector: multiprocessing.Queue vs shared-memory rings."""
+    print(f"{'producers':>9} {'transport':>14} {'msgs/s':>10}")
+    for producers in producer_counts:
+        total = producers * messages_per_producer
+
+        queue = multiprocessing.Queue(maxsize=10_000)
+        collector = multiprocessing.Process(target=_queue_collector, args=(queue, producers))
+        collector.start()
+        start = time.perf_counter()
+        workers = [multiprocessing.Process(target=_queue_producer, args=(queue, messages_per_producer))
+                   for _ in range(producers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        for _ in range(producers):
+            queue.put(None)
+        collector.join()
+        print(f"{producers:>9} {'mp.Queue':>14} {total / (time.perf_counter() - start):>10,.0f}")
+
+        transport = SharedMemoryLogTransport(_counting_handlers, producers=producers)
+        start = time.perf_counter()
+        workers = [multiprocessing.Process(target=_ring_producer, args=(transport.producer(i), messages_per_producer))
+                   for i in range(producers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        transport.close()
+        elapsed = time.perf_counter() - start
+        assert transport.delivered == total
+        print(f"{producers:>9} {'shared memory':>14} {total / elapsed:>10,.0f}")
+
+
+def benchmark_log_storm(records=200_000):
+    """One error path firing in a loop: caller cost per record and lines reaching the handler, per filter."""
+    print(f"{'filters':>14} {'ns/record':>10} {'delivered':>10}")
+    for name, filters in (("none", []),
+                          ("rate limit", [RateLimitFilter(rate=100, burst=100)]),
+                          ("sample 1%", [SamplingFilter({LogLevel.ERROR: 0.01})]),
+                          ("dedup", [DedupFilter(window=1.0)])):
+        logger, handler = _fresh_logger(in_process=True, filters=filters)
+        start = time.perf_counter()
+        for _ in range(records):
+            logger.log(LogLevel.ERROR, "payment gateway timeout for merchant %s", "acme")
+        logger.flush()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>14} {elapsed / records * 1e9:>10.0f} {handler.count:>10,}")
+
+
+def benchmark_log_index(lines=600_000):
+    """Index build rate over rotated segments, then query latency vs scanning every file."""
+    users = [f"user{i}" for i in range(5_000)]
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = os.path.join(directory, "app.log")
+        handler = BufferedFileHandler(log_file, max_bytes=16 * 1024 * 1024, backup_count=100, compress=False)
+        base = int(time.time()) - 3_600
+        for i in range(lines):
+            stamp = datetime.fromtimestamp(base + i * 3_600 // lines).strftime("%Y-%m-%d %H:%M:%S")
+            level = "ERROR" if i % 500 == 0 else "INFO"
+            handler.write(f"[{stamp}] [{level}] order {i} for {users[i % len(users)]} handled in {i % 97} ms")
+        handler.close()
+        segment_paths = sorted(glob.glob(log_file + ".*")) + [log_file]
+        total_bytes = sum(os.path.getsize(path) for path in segment_paths)
+        print(f"{lines:,} lines, {total_bytes / 2**20:.0f} MiB in {len(segment_paths)} segments")
+
+        indexer = LogIndexer(log_file, os.path.join(directory, "index"))
+        start = time.perf_counter()
+        indexer.refresh()
+        print(f"index build: {lines / (time.perf_counter() - start):,.0f} lines/s")
+
+        def scan(predicate):
+            hits = 0
+            for path in segment_paths:
+                with open(path) as f:
+                    hits += sum(1 for line in f if predicate(line))
+            return hits
+
+        window_start = datetime.fromtimestamp(base + 1_800)
+        cutoff = window_start.strftime("%Y-%m-%d %H:%M:%S")
+        queries = (
+            ("user500 AND error", dict(all_terms=["user500"], min_level=LogLevel.ERROR),
+             lambda line: " user500 " in line and "[ERROR]" in line),
+            ("(user1 OR user2) late", dict(any_terms=["user1", "user2"], start=window_start),
+             lambda line: line[1:20] >= cutoff and (" user1 " in line or " user2 " in line)),
+            ("errors, last half", dict(min_level=LogLevel.ERROR, start=window_start),
+             lambda line: line[1:20] >= cutoff and "[ERROR]" in line),
+        )
+        print(f"{'query':>22} {'index (ms)':>11} {'scan (ms)':>10} {'hits':>6}")
+        for name, kwargs, predicate in queries:
+            start = time.perf_counter()
+            hits = len(indexer.query(**kwargs))
+            index_ms = (time.perf_counter() - start) * 1e3
+            start = time.perf_counter()
+            scanned = scan(predicate)
+            scan_ms = (time.perf_counter() - start) * 1e3
+            assert hits == scanned, (name, hits, scanned)
+            print(f"{name:>22} {index_ms:>11.1f} {scan_ms:>10.0f} {hits:>6}")
+        indexer.close()
+
+
+class CongestedHandler(CountingHandler):
+    """Sink that takes delay seconds per write, or blocks until released when stuck."""
+    def __init__(self, delay=0.001):
+        super().__init__()
+        self.delay = delay
+        self.unstuck = threading.Event()
+        self.unstuck.set()
+
+    def write(self, message: str):
+        self.unstuck.wait()
+        time.sleep(self.delay)
+        self.count += 1
+
+
+def benchmark_handler_isolation(records=2_000):
+    """Caller latency with a congested sink next to a fast one, shared vs isolated dispatch, and a stall."""
+    Logger.set_lock_backend(LocalLock())
+    print(f"{'dispatch':>9} {'p50 (us)':>9} {'p99 (us)':>9} {'fast sink got':>14}")
+    for name, isolate in (("shared", False), ("isolated", True)):
+        fast, slow = CountingHandler(), CongestedHandler()
+        Logger._instance = None
+        logger = Logger(level=LogLevel.INFO, handlers=[fast, slow], isolate_handlers=isolate)
+        latencies = []
+        for i in range(records):
+            start = time.perf_counter()
+            logger.log(LogLevel.INFO, "request %d handled", i)
+            latencies.append(time.perf_counter() - start)
+        if isolate:
+            logger.handlers[0].flush()
+        fast_count = fast.count
+        latencies.sort()
+        print(f"{name:>9} {latencies[len(latencies) // 2] * 1e6:>9.1f} {latencies[len(latencies) * 99 // 100] * 1e6:>9.1f} "
+              f"{fast_count:>14,}")
+        for handler in logger.handlers:
+            if isinstance(handler, HandlerDispatcher):
+                handler.close()
+
+    # A sink that hangs: the breaker detaches it, the fast sink keeps everything
+    fast, stuck = CountingHandler(), CongestedHandler(delay=0)
+    stuck.unstuck.clear()
+    fast_dispatch = HandlerDispatcher(fast)
+    stuck_dispatch = HandlerDispatcher(stuck, stall_timeout=0.2, retry_after=0.5)
+    for i in range(records):
+        fast_dispatch.write(f"record {i}")
+        stuck_dispatch.write(f"record {i}")
+        if i == records // 2:
+            time.sleep(0.3)
+    fast_dispatch.flush()
+    metrics = stuck_dispatch.metrics()
+    print(f"stalled sink: breaker {metrics['breaker']}, trips {metrics['trips']}, shed {metrics['dropped']:,}; "
+          f"fast sink got {fast.count:,}/{records:,}")
+    stuck.unstuck.set()
+    time.sleep(0.6)
+    stuck_dispatch.write("after recovery")
+    stuck_dispatch.flush()
+    print(f"after recovery: breaker {stuck_dispatch.metrics()['breaker']}, stuck sink got {stuck.count:,}")
+    fast_dispatch.close()
+    stuck_dispatch.close()
+
+
+def _import_time_us(statement):
+    # Cumulative microseconds of the last top-level import reported by -X importtime
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    lines = [line for line in result.stderr.splitlines() if line.startswith("import time:") and "|" in line]
+    imported = {line.rsplit("|", 1)[1].strip() for line in lines}
+    return int(lines[-1].split("|")[1]), imported
+
+
+def benchmark_import_time(runs=5, budget_us=100_000):
+    """Cumulative import time of loggingFramework (best of runs); fails if it regresses past budget_us or pulls in redis."""
+    best, imported = min(_import_time_us("import loggingFramework") for _ in range(runs))
+    print(f"import loggingFramework: {best / 1e3:7.1f} ms")
+    if importlib.util.find_spec("redis") is None:
+        print("import redis (avoided):  skipped, redis is not installed")
+    else:
+        redis_us = min(_import_time_us("import redis")[0] for _ in range(runs))
+        print(f"import redis (avoided):  {redis_us / 1e3:7.1f} ms")
+    assert "redis" not in imported, "loggingFramework imports redis at import time"
+    assert best < budget_us, f"import took {best} us, budget is {budget_us} us"
+
+
+BENCHMARKS = {
+    "in_process": benchmark_in_process,
+    "file_handlers": benchmark_file_handlers,
+    "async_overflow": benchmark_async_overflow,
+    "lazy_formatting": benchmark_lazy_formatting,
+    "binary_format": benchmark_binary_format,
+    "shared_memory": benchmark_shared_memory,
+    "log_storm": benchmark_log_storm,
+    "log_index": benchmark_log_index,
+    "handler_isolation": benchmark_handler_isolation,
+    "import_time": benchmark_import_time,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        print(f"\n== {name} ==")
+        BENCHMARKS[name]()
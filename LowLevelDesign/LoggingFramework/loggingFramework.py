@@ -1,11 +1,11 @@
-import redis
+import atexit
+import os
+import random
+import time
 from datetime import datetime
 from enum import Enum
 from queue import Queue
-from threading import Thread
-
-# Initialize Redis
-r = redis.Redis(host='localhost', port=6379, db=0)
+from threading import Condition, Event, Lock, Thread
 
 # Enum for Log Levels
 class LogLevel(Enum):
@@ -15,11 +15,52 @@ class LogLevel(Enum):
     ERROR = 4
     FATAL = 5
 
+# Offset from time.monotonic_ns() to wall-clock nanoseconds, fixed at import
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+# Structured Log Record
+class LogRecord:
+    """
+    One structured log event: level, monotonic timestamp (ns), logger name,
+    message and a dict of typed fields (str, int, float, bool or None).
+    Monotonic timestamps never go backwards when the wall clock is adjusted,
+    so records from one process stay ordered.
+    """
+    __slots__ = ("level", "timestamp_ns", "name", "message", "fields")
+
+    def __init__(self, level: LogLevel, message: str, name: str = "root", fields=None, timestamp_ns=None):
+        self.level = level
+        self.timestamp_ns = time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        self.name = name
+        self.message = message
+        self.fields = fields or {}
+
+    def wall_time(self) -> datetime:
+        return datetime.fromtimestamp((self.timestamp_ns + _WALL_CLOCK_OFFSET_NS) / 1e9)
+
+    def format(self) -> str:
+        text = f"[{self.wall_time().strftime('%Y-%m-%d %H:%M:%S')}] [{self.level.name}] {self.name}: {self.message}"
+        if self.fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in self.fields.items())
+        return text
+
+    def __repr__(self):
+        return f"LogRecord({self.format()!r})"
+
 # Base class for Log Handlers
 class LogHandler:
     def write(self, message: str):
         raise NotImplementedError
 
+    def write_batch(self, messages):
+        # Handlers that can do better than one write per record override this
+        for message in messages:
+            self.write(message)
+
+    def write_record(self, record: LogRecord):
+        # Text handlers get the rendered line; structured sinks override this
+        self.write(record.format())
+
 # Console Log Handler
 class ConsoleHandler(LogHandler):
     def write(self, message: str):
@@ -34,26 +75,515 @@ class FileHandler(LogHandler):
         with open(self.file_name, "a") as f:
             f.write(message + "\n")
 
-# Asynchronous Log Handler using Queue
+# Buffered File Log Handler with rotation
+class BufferedFileHandler(LogHandler):
+    """
+    Keeps the file open and appends records to an in-memory buffer. The
+    buffer is written out when it reaches buffer_size bytes, every
+    flush_interval seconds from a background thread, and on close() (which
+    also runs at interpreter exit).
+
+    The file is rotated when it grows past max_bytes or when rotate_interval
+    seconds have passed. Rotated segments are gzip-compressed on a background
+    thread so the writers are never blocked on compression, and only the
+    newest backup_count segments are kept.
+    """
+    def __init__(self, file_name: str, buffer_size: int = 64 * 1024, flush_interval: float = 1.0,
+                 max_bytes: int = None, rotate_interval: float = None, backup_count: int = 5,
+                 compress: bool = True):
+        self.file_name = file_name
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self.buffer = bytearray()
+        self.lock = Lock()
+        self.file = open(file_name, "ab")
+        self.file_size = self.file.tell()
+        self.next_rotation = time.time() + rotate_interval if rotate_interval else None
+        self.rotation_seq = 0
+        self.closed = False
+
+        self._compress_queue = Queue()
+        self._compressor = Thread(target=self._compress_segments, daemon=True)
+        self._compressor.start()
+        self._stop = Event()
+        self._flusher = Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def write(self, message: str):
+        with self.lock:
+            self.buffer += message.encode()
+            self.buffer += b"\n"
+            if len(self.buffer) >= self.buffer_size:
+                self._flush_locked()
+
+    def write_batch(self, messages):
+        with self.lock:
+            for message in messages:
+                self.buffer += message.encode()
+                self.buffer += b"\n"
+            if len(self.buffer) >= self.buffer_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def close(self):
+        if self.closed:
+            return
+        self._stop.set()
+        self._flusher.join()
+        with self.lock:
+            self._flush_locked()
+            self.file.close()
+            self.closed = True
+        self._compress_queue.put(None)
+        self._compressor.join()
+
+    def _flush_locked(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.file_size += len(self.buffer)
+            self.buffer.clear()
+        if (self.max_bytes and self.file_size >= self.max_bytes) or \
+                (self.next_rotation and time.time() >= self.next_rotation):
+            self._rotate_locked()
+
+    def _rotate_locked(self):
+        self.file.close()
+        self.rotation_seq += 1
+        rotated = f"{self.file_name}.{time.strftime('%Y%m%d-%H%M%S')}.{self.rotation_seq}"
+        os.replace(self.file_name, rotated)
+        self.file = open(self.file_name, "ab")
+        self.file_size = 0
+        if self.rotate_interval:
+            self.next_rotation = time.time() + self.rotate_interval
+        self._compress_queue.put(rotated)
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _compress_segments(self):
+        # Only needed once a file rotates, so they stay out of module import time
+        import glob
+        import gzip
+        import shutil
+        while True:
+            segment = self._compress_queue.get()
+            if segment is None:
+                return
+            if not os.path.exists(segment):  # already pruned
+                continue
+            if self.compress:
+                with open(segment, "rb") as src, gzip.open(segment + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(segment)
+            # Drop the oldest segments beyond backup_count (names sort by rotation time)
+            segments = sorted(glob.glob(glob.escape(self.file_name) + ".*"), key=os.path.getmtime)
+            for old in segments[:-self.backup_count] if self.backup_count else segments:
+                os.remove(old)
+
+# Overflow policies for AsyncLogHandler
+class OverflowPolicy(Enum):
+    BLOCK = "block"              # writer waits for room
+    DROP_OLDEST = "drop_oldest"  # newest records win
+    SAMPLE = "sample"            # keep every Nth record while full, dropping the oldest for it
+
+# Asynchronous Log Handler using a bounded ring buffer
 class AsyncLogHandler(LogHandler):
-    def __init__(self):
-        self.queue = Queue()
+    """
+    Decouples callers from slow handlers. write() puts the record into a
+    fixed-size ring buffer; a worker thread drains it in batches of up to
+    batch_size and fans each batch out to the downstream handlers.
+
+    When the buffer is full the overflow_policy decides what happens, so
+    memory stays bounded under bursts. flush() waits until everything queued
+    so far has been handed to the handlers, and close() (also run at exit)
+    drains the buffer before stopping the worker.
+
+    Counters: depth (records queued now), max_depth (high-water mark),
+    dropped (records lost to the overflow policy) and errors (handler
+    exceptions; the worker keeps going).
+    """
+    def __init__(self, handlers=None, capacity: int = 8192,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 batch_size: int = 256, sample_every: int = 10):
+        self.handlers = handlers or [ConsoleHandler()]
+        self.capacity = capacity
+        self.overflow_policy = overflow_policy
+        self.batch_size = batch_size
+        self.sample_every = sample_every
+        self.ring = [None] * capacity
+        self.head = 0   # index of the oldest record
+        self.depth = 0
+        self.max_depth = 0
+        self.dropped = 0
+        self.errors = 0
+        self.overflow_seen = 0
+        self.in_flight = 0
+        self.closed = False
+        self.lock = Lock()
+        self.not_empty = Condition(self.lock)
+        self.not_full = Condition(self.lock)
+        self.drained = Condition(self.lock)
         self.worker = Thread(target=self._process_logs, daemon=True)
         self.worker.start()
+        atexit.register(self.close)
 
     def write(self, message: str):
-        self.queue.put(message)
+        with self.lock:
+            if self.closed:
+                self.dropped += 1
+                return
+            while self.depth == self.capacity:
+                if self.overflow_policy == OverflowPolicy.BLOCK:
+                    self.not_full.wait()
+                    continue
+                if self.overflow_policy == OverflowPolicy.SAMPLE:
+                    self.overflow_seen += 1
+                    if self.overflow_seen % self.sample_every:
+                        self.dropped += 1
+                        return
+                # Make room by discarding the oldest record
+                self.head = (self.head + 1) % self.capacity
+                self.depth -= 1
+                self.dropped += 1
+            self.ring[(self.head + self.depth) % self.capacity] = message
+            self.depth += 1
+            if self.depth > self.max_depth:
+                self.max_depth = self.depth
+            self.not_empty.notify()
+
+    def flush(self):
+        with self.lock:
+            while self.depth or self.in_flight:
+                self.drained.wait()
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.not_empty.notify()
+        self.worker.join()
+        for handler in self.handlers:
+            if hasattr(handler, "close"):
+                handler.close()
+
+    def _take_batch(self):
+        count = min(self.depth, self.batch_size)
+        batch = []
+        for _ in range(count):
+            batch.append(self.ring[self.head])
+            self.ring[self.head] = None
+            self.head = (self.head + 1) % self.capacity
+        self.depth -= count
+        return batch
 
     def _process_logs(self):
         while True:
-            message = self.queue.get()
-            print(message)  # Replace with actual log processing
+            with self.lock:
+                while not self.depth and not self.closed:
+                    self.not_empty.wait()
+                if not self.depth:
+                    self.drained.notify_all()
+                    return
+                batch = self._take_batch()
+                self.in_flight = len(batch)
+                self.not_full.notify_all()
+            self._deliver(batch)
+            with self.lock:
+                self.in_flight = 0
+                if not self.depth:
+                    self.drained.notify_all()
+
+    def _deliver(self, batch):
+        for handler in self.handlers:
+            try:
+                handler.write_batch(batch)
+            except Exception:
+                self.errors += 1
+
+# Circuit breaker states for HandlerDispatcher
+class BreakerState(Enum):
+    CLOSED = "closed"        # records flow to the handler
+    OPEN = "open"            # handler detached, records are shed
+    HALF_OPEN = "half_open"  # one more chance after retry_after
+
+# Per-handler dispatch queue with metrics and a circuit breaker
+class HandlerDispatcher(AsyncLogHandler):
+    """
+    Gives one handler its own ring buffer and worker thread, so it drains at
+    its own pace and a slow sink never delays the others or the caller:
+    write() is an enqueue. Logger(isolate_handlers=True) wraps every handler
+    in one of these. The default DROP_OLDEST policy keeps the enqueue
+    non-blocking even when the sink falls behind.
+
+    The circuit breaker detaches the handler when a batch has been stuck in
+    it for longer than stall_timeout seconds, or after max_errors failed
+    batches in a row. While detached, records are shed (counted in
+    dropped). After retry_after seconds it goes half-open: records are
+    queued again, and the next batch that succeeds closes the breaker.
+
+    metrics() reports backlog, drops, errors, breaker state, trips and the
+    per-batch write latency (count, mean, max, last).
+    """
+    def __init__(self, handler: LogHandler, capacity: int = 8192,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST, batch_size: int = 256,
+                 stall_timeout: float = 2.0, max_errors: int = 5, retry_after: float = 10.0):
+        self.handler = handler
+        self.stall_timeout = stall_timeout
+        self.max_errors = max_errors
+        self.retry_after = retry_after
+        self.state = BreakerState.CLOSED
+        self.trips = 0
+        self.reopen_at = 0.0
+        self.consecutive_errors = 0
+        self.batch_started = None
+        self.batches = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_last = 0.0
+        super().__init__(handlers=[handler], capacity=capacity, overflow_policy=overflow_policy,
+                         batch_size=batch_size)
+
+    def _trip(self, now):
+        self.state = BreakerState.OPEN
+        self.reopen_at = now + self.retry_after
+        self.trips += 1
+
+    def write(self, message):
+        now = time.monotonic()
+        started = self.batch_started
+        if self.state != BreakerState.OPEN and started is not None and now - started > self.stall_timeout:
+            self._trip(now)
+        if self.state == BreakerState.OPEN:
+            # Stay detached while the stalled batch has not come back
+            if now < self.reopen_at or self.batch_started is not None:
+                with self.lock:
+                    self.dropped += 1
+                return
+            self.state = BreakerState.HALF_OPEN
+        super().write(message)
+
+    def write_record(self, record: LogRecord):
+        # Keep the record structured until it reaches the handler
+        self.write(record)
+
+    def flush(self):
+        # Wait for the queue to drain, but not on a stalled handler: once a
+        # batch has been stuck for stall_timeout the breaker opens and we stop
+        with self.lock:
+            while (self.depth or self.in_flight) and self.state != BreakerState.OPEN:
+                started = self.batch_started
+                now = time.monotonic()
+                if started is not None and now - started > self.stall_timeout:
+                    self._trip(now)
+                    break
+                self.drained.wait(self.stall_timeout / 4)
+
+    def close(self):
+        # A stalled handler must not hang interpreter exit: give the worker
+        # stall_timeout to drain, then leave the daemon thread behind
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.not_empty.notify()
+        self.worker.join(self.stall_timeout)
+        if not self.worker.is_alive() and hasattr(self.handler, "close"):
+            self.handler.close()
+
+    def _deliver(self, batch):
+        start = self.batch_started = time.monotonic()
+        try:
+            if any(isinstance(message, LogRecord) for message in batch):
+                for message in batch:
+                    if isinstance(message, LogRecord):
+                        self.handler.write_record(message)
+                    else:
+                        self.handler.write(message)
+            else:
+                self.handler.write_batch(batch)
+        except Exception:
+            self.errors += 1
+            self.consecutive_errors += 1
+            if self.consecutive_errors >= self.max_errors or self.state == BreakerState.HALF_OPEN:
+                self._trip(time.monotonic())
+        else:
+            self.consecutive_errors = 0
+            if self.state == BreakerState.HALF_OPEN:
+                self.state = BreakerState.CLOSED
+        finally:
+            latency = time.monotonic() - start
+            self.batch_started = None
+            self.batches += 1
+            self.latency_total += latency
+            self.latency_last = latency
+            if latency > self.latency_max:
+                self.latency_max = latency
+
+    def metrics(self) -> dict:
+        return {
+            "handler": type(self.handler).__name__,
+            "backlog": self.depth,
+            "max_backlog": self.max_depth,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "breaker": self.state.value,
+            "trips": self.trips,
+            "batches": self.batches,
+            "latency_mean": self.latency_total / self.batches if self.batches else 0.0,
+            "latency_max": self.latency_max,
+            "latency_last": self.latency_last,
+        }
+
+# Log Filters
+class LogFilter:
+    """
+    Decides whether a record goes to the handlers. Filters run after the
+    level check and before the message is formatted. They get the template
+    and its arguments (for log_structured, the message and (fields,)).
+
+    Filters are called from many threads without a lock. Their state is kept
+    in single dict entries or tuples that are replaced in one step, so a race
+    can make a count slightly off but never corrupts it.
+    """
+    def allow(self, logger, level: LogLevel, template: str, args) -> bool:
+        raise NotImplementedError
+
+    def flush(self, logger):
+        # Filters that hold back a summary write it out here
+        pass
+
+# Token bucket per message template
+class RateLimitFilter(LogFilter):
+    """
+    Each template gets a bucket of burst tokens that refills at rate tokens
+    per second. A record that finds its bucket empty is dropped. The next
+    record that gets through is preceded by a note saying how many were
+    suppressed. Templates are code constants, so the table stays small;
+    it is cleared if it ever grows past max_templates.
+    """
+    def __init__(self, rate: float = 10.0, burst: int = 20, max_templates: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_templates = max_templates
+        self.buckets = {}  # template -> [tokens, last refill, suppressed]
+
+    def allow(self, logger, level, template, args):
+        now = time.monotonic()
+        bucket = self.buckets.get(template)
+        if bucket is None:
+            if len(self.buckets) >= self.max_templates:
+                self.buckets.clear()
+            bucket = self.buckets.setdefault(template, [self.burst, now, 0])
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            bucket[2] += 1
+            return False
+        bucket[0] = tokens - 1
+        suppressed = bucket[2]
+        if suppressed:
+            bucket[2] = 0
+            logger._emit(LogLevel.WARNING, f"rate limit: {suppressed} records suppressed for {template!r}")
+        return True
+
+# Probabilistic sampling per level
+class SamplingFilter(LogFilter):
+    """Keeps each record with the probability given for its level, e.g. {LogLevel.DEBUG: 0.01}."""
+    def __init__(self, rates):
+        self.rates = {level.value: rate for level, rate in rates.items()}
+
+    def allow(self, logger, level, template, args):
+        rate = self.rates.get(level.value)
+        return rate is None or random.random() < rate
+
+# Collapse repeated records
+class DedupFilter(LogFilter):
+    """
+    Drops a record identical (same level, template and arguments) to the one
+    just before it, as long as the first of the run is less than window
+    seconds old. When the run ends, "last message repeated N times" is
+    written before the next record, like syslog does. Logger.flush() writes
+    out the summary of a run still in progress.
+    """
+    def __init__(self, window: float = 5.0):
+        self.window = window
+        self.last = (None, 0.0, 0)  # ((level, template, args), run start, repeats)
+
+    def allow(self, logger, level, template, args):
+        key = (level, template, args)
+        now = time.monotonic()
+        last_key, started, repeats = self.last
+        if key == last_key and now - started < self.window:
+            self.last = (last_key, started, repeats + 1)
+            return False
+        self.last = (key, now, 0)
+        if repeats:
+            logger._emit(last_key[0], f"last message repeated {repeats} times")
+        return True
+
+    def flush(self, logger):
+        last_key, started, repeats = self.last
+        if repeats:
+            self.last = (last_key, started, 0)
+            logger._emit(last_key[0], f"last message repeated {repeats} times")
+
+# Redis client, created on first use so importing this module never needs redis
+_redis_client = None
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis(host='localhost', port=6379, db=0)
+    return _redis_client
+
+# Lock backends used by Logger to serialise handler writes and singleton creation
+class LockBackend:
+    def acquire(self):
+        raise NotImplementedError
+
+    def release(self):
+        raise NotImplementedError
+
+# Local Lock: the default, coordinates threads of this process only
+class LocalLock(LockBackend):
+    def __init__(self, name=None):
+        self.name = name
+        self.lock = Lock()
+
+    def acquire(self):
+        return self.lock.acquire()
+
+    def release(self):
+        self.lock.release()
 
 # Redis Lock Implementation
-class RedisLock:
-    def __init__(self, name, timeout=5):
+class RedisLock(LockBackend):
+    """
+    Lock shared by every process that talks to the same Redis. client
+    defaults to get_redis_client(), looked up on first acquire.
+    """
+    def __init__(self, name, timeout=5, client=None):
         self.name = f"lock:{name}"
         self.timeout = timeout
+        self.client = client
+
+    def _client(self):
+        if self.client is None:
+            self.client = get_redis_client()
+        return self.client
 
     def acquire(self):
         # Attempt to set a value in Redis with the key `self.name`
@@ -61,15 +591,33 @@ class RedisLock:
         # `ex=self.timeout` sets an expiration time for the key in seconds
         # `nx=True` ensures that the key is only set if it does not already exist
         # The method returns True if the key was set, and None if it was not
-        return r.set(self.name, "1", ex=self.timeout, nx=True)
+        return self._client().set(self.name, "1", ex=self.timeout, nx=True)
 
     def release(self):
-        r.delete(self.name)
+        self._client().delete(self.name)
 
 # Logger Class
 class Logger:
     _instance = None
-    _redis_lock = RedisLock("logger_lock")
+    _lock_backend = None
+    _local_lock = Lock()
+
+    @classmethod
+    def set_lock_backend(cls, backend: LockBackend):
+        """
+        Choose the lock that guards handler writes and singleton creation,
+        e.g. Logger.set_lock_backend(RedisLock("logger_lock")) when several
+        processes share handlers. Defaults to a LocalLock.
+        """
+        cls._lock_backend = backend
+
+    @classmethod
+    def _distributed_lock(cls) -> LockBackend:
+        if cls._lock_backend is None:
+            with cls._local_lock:
+                if cls._lock_backend is None:
+                    cls._lock_backend = LocalLock("logger_lock")
+        return cls._lock_backend
     
     def __new__(cls, *args, **kwargs):
         """
@@ -77,24 +625,37 @@ class Logger:
         We use this method to implement the Singleton pattern, which ensures that there is
         only one instance of the Logger class.
 
-        The Singleton pattern is implemented using a Redis lock. Before creating a new
-        Logger instance, we acquire a Redis lock. If the lock is acquired successfully,
+        The Singleton pattern is implemented using the lock backend (a LocalLock
+        unless set_lock_backend chose e.g. a RedisLock). Before creating a new
+        Logger instance, we acquire the lock. If the lock is acquired successfully,
         we check if the Logger instance is None. If it is, we create a new Logger instance.
-        Finally, we release the Redis lock.
+        Finally, we release the lock.
 
-        If the Redis lock is not acquired, it means that another process is currently
+        If the lock is not acquired, it means that another process is currently
         creating a Logger instance. In this case, we simply return the existing instance.
+
+        An in-process Logger never uses the lock backend. Each process gets its
+        own instance anyway, so the lock would only guard threads of this process.
         """
-        if cls._redis_lock.acquire():
+        # in_process is keyword-only in __init__, so it is always in kwargs
+        if kwargs.get("in_process"):
+            with cls._local_lock:
+                if cls._instance is None:
+                    cls._instance = super(Logger, cls).__new__(cls)
+            return cls._instance
+        lock = cls._distributed_lock()
+        if lock.acquire():
             if cls._instance is None:
                 # Create a new Logger instance
                 cls._instance = super(Logger, cls).__new__(cls)
-            # Release the Redis lock
-            cls._redis_lock.release()
+            # Release the lock
+            lock.release()
         # Return the Logger instance
         return cls._instance
     
-    def __init__(self, level: LogLevel = LogLevel.INFO, handlers=None):
+    def __init__(self, level: LogLevel = LogLevel.INFO, handlers=None, *,
+                 in_process: bool = False, queue_size: int = 10000, filters=None,
+                 isolate_handlers: bool = False):
         """
         Initialize the Logger instance.
 
@@ -112,13 +673,59 @@ class Logger:
 
         If handlers is not provided, we default to a list containing a single
         ConsoleHandler instance.
+
+        With in_process=True, log() does not touch the lock backend. Records go into a
+        bounded queue and a single writer thread hands them to the handlers,
+        so handlers are only ever called from one thread per process. When
+        the queue is full, log() blocks until there is room; records are
+        never dropped.
+
+        A handler that raises does not stop the writer thread: the error is
+        counted in handler_errors and the other handlers still get the
+        record. The queue is flushed at interpreter exit.
+
+        filters is the initial filter chain; see add_filter().
+
+        With isolate_handlers=True each handler is wrapped in a
+        HandlerDispatcher with its own queue and worker thread, so a slow
+        handler only delays itself; see handler_metrics().
         """
         if not hasattr(self, "initialized"):
-            self.level = level
-            self.handlers = handlers or [ConsoleHandler()]
+            self.set_level(level)
+            # (second, "[YYYY-mm-dd HH:MM:SS] ") for the last second we formatted
+            self._timestamp_cache = (None, "")
+            self.isolate_handlers = isolate_handlers
+            self.handlers = [self._wrap_handler(handler) for handler in handlers or [ConsoleHandler()]]
+            self.filters = list(filters or [])
+            self.in_process = in_process
+            self.handler_errors = 0
+            if in_process:
+                self._queue = Queue(maxsize=queue_size)
+                self._writer = Thread(target=self._write_records, daemon=True)
+                self._writer.start()
+                # The writer is a daemon thread, so drain it before exit
+                atexit.register(self.flush)
             self.initialized = True
     
-    def log(self, level: LogLevel, message: str):
+    def is_enabled_for(self, level: LogLevel) -> bool:
+        """Cheap precheck for callers that need to do work before logging."""
+        return level.value >= self._level_value
+
+    def _timestamp_prefix(self) -> str:
+        """
+        Return "[YYYY-mm-dd HH:MM:SS] " for the current second. The string is
+        only rebuilt when the second changes. The cache is a single tuple, so
+        a thread that races the update sees either the old or the new pair,
+        never a mix.
+        """
+        second = int(time.time())
+        cached_second, prefix = self._timestamp_cache
+        if second != cached_second:
+            prefix = datetime.fromtimestamp(second).strftime("[%Y-%m-%d %H:%M:%S] ")
+            self._timestamp_cache = (second, prefix)
+        return prefix
+
+    def log(self, level: LogLevel, message: str, *args):
         """
         Log a message with the given level.
 
@@ -126,41 +733,145 @@ class Logger:
         the current log level. If it is, it formats the message with a timestamp
         and the log level name, and writes it to each of the log handlers.
 
-        The method acquires the Redis lock before writing to the log handlers,
-        to ensure that only one process can write to the log handlers at a time.
-        """
-        if level.value >= self.level.value:
-            # Get the current timestamp
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            # Format the message with the timestamp and log level name
-            formatted_message = f"[{timestamp}] [{level.name}] {message}"
-            
-            # Acquire the Redis lock
-            if self._redis_lock.acquire():
-                # Write the formatted message to each of the log handlers
+        The message can be a printf-style template with its arguments passed
+        separately, e.g. log(LogLevel.DEBUG, "cache miss for %s", key). The
+        template is only formatted when the level is enabled, so a disabled
+        call costs little more than the level comparison.
+
+        Enabled records then pass through the filter chain (rate limiting,
+        sampling, dedup) before the template is formatted, so dropped records
+        are never formatted either.
+
+        The method acquires the lock backend before writing to the log handlers,
+        to ensure that only one writer (one process, with a RedisLock) can
+        write to the log handlers at a time.
+        In in-process mode the message is queued for the writer thread instead.
+        """
+        if level.value >= self._level_value:
+            for log_filter in self.filters:
+                if not log_filter.allow(self, level, message, args):
+                    return
+            if args:
+                message = message % args
+            self._emit(level, message)
+
+    def _emit(self, level: LogLevel, message: str):
+        # Format the message with the timestamp and log level name
+        formatted_message = f"{self._timestamp_prefix()}[{level.name}] {message}"
+
+        if self.in_process:
+            # Blocks while the queue is full, so the record is never dropped
+            self._queue.put(formatted_message)
+        else:
+            lock = self._distributed_lock()
+            if lock.acquire():
+                try:
+                    # Write the formatted message to each of the log handlers
+                    for handler in self.handlers:
+                        handler.write(formatted_message)
+                finally:
+                    # A LocalLock has no expiry, so it must be released even if a handler fails
+                    lock.release()
+
+    def log_structured(self, level: LogLevel, message: str, name: str = "root", **fields):
+        """
+        Log a structured record, e.g.
+        log_structured(LogLevel.INFO, "request handled", name="api", path="/orders", status=200).
+
+        Handlers receive a LogRecord through write_record. Text handlers render
+        it as one line, while BinaryLogHandler keeps the fields typed. Level
+        filtering and locking are the same as for log().
+        """
+        if level.value >= self._level_value:
+            for log_filter in self.filters:
+                if not log_filter.allow(self, level, message, (fields,)):
+                    return
+            record = LogRecord(level, message, name, fields)
+            if self.in_process:
+                self._queue.put(record)
+            else:
+                lock = self._distributed_lock()
+                if lock.acquire():
+                    try:
+                        for handler in self.handlers:
+                            handler.write_record(record)
+                    finally:
+                        lock.release()
+
+    def _write_records(self):
+        # Single writer thread for in-process mode
+        while True:
+            message = self._queue.get()
+            try:
                 for handler in self.handlers:
-                    handler.write(formatted_message)
-                # Release the Redis lock
-                self._redis_lock.release()
-    
+                    try:
+                        if isinstance(message, LogRecord):
+                            handler.write_record(message)
+                        else:
+                            handler.write(message)
+                    except Exception:
+                        # A failing handler must not kill the writer thread
+                        self.handler_errors += 1
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        Write out summaries held by filters, then block until every queued
+        record has reached the handlers (in-process mode) and every isolated
+        handler has drained its own queue. A stalled isolated handler is
+        detached by its breaker rather than waited on.
+        """
+        for log_filter in self.filters:
+            log_filter.flush(self)
+        if self.in_process:
+            self._queue.join()
+        for handler in self.handlers:
+            if isinstance(handler, HandlerDispatcher):
+                handler.flush()
+
     def set_level(self, level: LogLevel):
         self.level = level
+        # Plain int copy so the hot-path check skips the Enum lookup on self.level
+        self._level_value = level.value
     
+    def add_filter(self, log_filter: LogFilter):
+        """
+        Append a filter to the chain. Records go through the filters in the
+        order they were added and stop at the first one that drops them. The
+        list is replaced rather than appended to, so threads iterating over
+        the old one are unaffected.
+        """
+        self.filters = self.filters + [log_filter]
+
+    def _wrap_handler(self, handler: LogHandler) -> LogHandler:
+        if self.isolate_handlers and not isinstance(handler, HandlerDispatcher):
+            return HandlerDispatcher(handler)
+        return handler
+
+    def handler_metrics(self):
+        """Backlog, latency and breaker metrics of every isolated handler."""
+        return [handler.metrics() for handler in self.handlers if isinstance(handler, HandlerDispatcher)]
+
     def add_handler(self, handler: LogHandler):
         """
         Add a log handler to the logger.
 
         This method adds the given log handler to the list of log handlers
-        that the logger will write to. We acquire the Redis lock before
+        that the logger will write to. We acquire the lock backend before
         modifying the list of log handlers, to ensure that only one process
-        can modify the list of log handlers at a time.
+        can modify the list of log handlers at a time. In in-process mode the
+        list is private to this process, so no lock is needed.
         """
-        # Acquire the Redis lock
-        if self._redis_lock.acquire():
-            # Add the log handler to the list of log handlers
+        handler = self._wrap_handler(handler)
+        if self.in_process:
             self.handlers.append(handler)
-            # Release the Redis lock
-            self._redis_lock.release()
+        else:
+            lock = self._distributed_lock()
+            if lock.acquire():
+                # Add the log handler to the list of log handlers
+                self.handlers.append(handler)
+                lock.release()
 
 # Example Usage
 if __name__ == "__main__":
@@ -0,0 +1,238 @@
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+
+from loggingFramework import LogHandler
+
+# Shared memory layout
+#
+#   control (64 bytes): stop:u64 delivered:u64
+#   ring[i]: head:u64 (cache line 0) tail:u64 (cache line 1) data[ring_bytes]
+#
+# head and tail are byte counters that only grow; the offset in data is
+# counter % ring_bytes. A record is length:u32 followed by UTF-8 bytes. A
+# record never wraps: when it does not fit before the end of data, the
+# producer writes a WRAP marker (if there is room for one) and starts again
+# at offset 0.
+_CONTROL_BYTES = 64
+_RING_HEADER_BYTES = 128
+_TAIL_OFFSET = 64
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+_WRAP = 0xFFFFFFFF
+
+
+def _ring_base(index, ring_bytes):
+    return _CONTROL_BYTES + index * (_RING_HEADER_BYTES + ring_bytes)
+
+
+# Producer side
+class SharedMemoryLogHandler(LogHandler):
+    """
+    Writes records into one ring of a SharedMemoryLogTransport. Each ring has
+    a single producer and a single consumer, so no lock is needed: only the
+    producer stores tail, after the record bytes are in place, and only the
+    collector stores head, after it has copied the record out. A producer
+    process therefore needs exactly one writing thread per ring, which is
+    what Logger(in_process=True) provides.
+
+    When the ring is full, write() waits for the collector; records are never
+    dropped.
+    """
+    def __init__(self, shm_name, index, ring_bytes, shm=None):
+        self.shm_name = shm_name
+        self.index = index
+        self.ring_bytes = ring_bytes
+        self.base = _ring_base(index, ring_bytes)
+        self.data = self.base + _RING_HEADER_BYTES
+        self.shm = shm
+        self.tail = None
+
+    def __getstate__(self):
+        # A spawned process attaches to the segment by name
+        state = self.__dict__.copy()
+        state["shm"] = None
+        return state
+
+    def _buffer(self):
+        if self.shm is None:
+            self.shm = shared_memory.SharedMemory(name=self.shm_name)
+        if self.tail is None:
+            self.tail = _U64.unpack_from(self.shm.buf, self.base + _TAIL_OFFSET)[0]
+        return self.shm.buf
+
+    def _append(self, buf, message):
+        data = message.encode()
+        limit = self.ring_bytes - _U32.size
+        if len(data) > limit:
+            # Cut on a character boundary, never inside a multi-byte UTF-8 sequence
+            data = data[:limit].decode(errors="ignore").encode()
+        need = _U32.size + len(data)
+        tail = self.tail
+        offset = tail % self.ring_bytes
+        remaining = self.ring_bytes - offset
+        skip = remaining if remaining < need else 0
+        backoff = 0.00001
+        while tail + skip + need - _U64.unpack_from(buf, self.base)[0] > self.ring_bytes:
+            # Full: let the collector catch up
+            self._publish(buf, tail)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 0.001)
+        if skip:
+            if remaining >= _U32.size:
+                _U32.pack_into(buf, self.data + offset, _WRAP)
+            tail += skip
+            offset = 0
+        start = self.data + offset
+        _U32.pack_into(buf, start, len(data))
+        buf[start + _U32.size:start + need] = data
+        self.tail = tail + need
+
+    def _publish(self, buf, tail):
+        _U64.pack_into(buf, self.base + _TAIL_OFFSET, tail)
+
+    def write(self, message: str):
+        buf = self._buffer()
+        self._append(buf, message)
+        self._publish(buf, self.tail)
+
+    def write_batch(self, messages):
+        # One tail store for the whole batch
+        buf = self._buffer()
+        for message in messages:
+            self._append(buf, message)
+        self._publish(buf, self.tail)
+
+
+# Collector process
+def _collect(shm_name, producers, ring_bytes, handler_factory, idle_sleep):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = shm.buf
+    handlers = handler_factory()
+    heads = [0] * producers
+    delivered = 0
+    idle = 0.0
+    try:
+        while True:
+            stopping = _U64.unpack_from(buf, 0)[0]
+            moved = False
+            for index in range(producers):
+                base = _ring_base(index, ring_bytes)
+                data = base + _RING_HEADER_BYTES
+                head = heads[index]
+                tail = _U64.unpack_from(buf, base + _TAIL_OFFSET)[0]
+                if head == tail:
+                    continue
+                messages = []
+                while head < tail:
+                    offset = head % ring_bytes
+                    remaining = ring_bytes - offset
+                    if remaining < _U32.size:
+                        head += remaining
+                        continue
+                    length = _U32.unpack_from(buf, data + offset)[0]
+                    if length == _WRAP:
+                        head += remaining
+                        continue
+                    start = data + offset + _U32.size
+                    # A bad record must not kill the collector for every producer
+                    messages.append(bytes(buf[start:start + length]).decode(errors="replace"))
+                    head += _U32.size + length
+                heads[index] = head
+                _U64.pack_into(buf, base, head)
+                for handler in handlers:
+                    handler.write_batch(messages)
+                delivered += len(messages)
+                _U64.pack_into(buf, 8, delivered)
+                moved = True
+            if moved:
+                idle = 0.0
+            elif stopping:
+                # The stop flag was read before this pass, so everything
+                # published before close() has been drained
+                break
+            else:
+                idle = min(idle * 2 or 0.00005, idle_sleep)
+                time.sleep(idle)
+    finally:
+        for handler in handlers:
+            if hasattr(handler, "close"):
+                handler.close()
+        del buf
+        shm.close()
+
+
+# Shared-memory Log Transport
+class SharedMemoryLogTransport:
+    """
+    Cross-process log transport for multi-worker deployments (e.g. gunicorn).
+    One shared memory segment holds a ring per producer process, and a single
+    collector process drains every ring to the handlers that
+    handler_factory() builds. Redis is not involved anywhere on this path.
+
+    handler_factory is called inside the collector process, so handlers that
+    own files or threads are created where they are used. Under the spawn
+    start method it must be a picklable (module-level) callable.
+
+    Usage: create the transport in the parent before forking the workers,
+    then in worker i use Logger(handlers=[transport.producer(i)], in_process=True).
+    Records from one producer arrive in order; records from different
+    producers are interleaved in collection order.
+    """
+    def __init__(self, handler_factory, producers=4, ring_bytes=1 << 20, idle_sleep=0.001):
+        self.producers = producers
+        self.ring_bytes = ring_bytes
+        # A new segment is zero-filled, so every head, tail and flag starts at 0
+        self.shm = shared_memory.SharedMemory(create=True, size=_ring_base(producers, ring_bytes))
+        self.collector = multiprocessing.Process(
+            target=_collect, args=(self.shm.name, producers, ring_bytes, handler_factory, idle_sleep), daemon=True)
+        self.collector.start()
+        self.closed = False
+
+    def producer(self, index: int) -> SharedMemoryLogHandler:
+        """Handler for producer slot index; give each process its own slot."""
+        if not 0 <= index < self.producers:
+            raise ValueError(f"producer index must be in [0, {self.producers})")
+        return SharedMemoryLogHandler(self.shm.name, index, self.ring_bytes, self.shm)
+
+    @property
+    def delivered(self) -> int:
+        """Records handed to the collector's handlers so far."""
+        if self.closed:
+            return self._delivered
+        return _U64.unpack_from(self.shm.buf, 8)[0]
+
+    def close(self):
+        """Drain every ring, stop the collector and free the segment. Call after the producers finish."""
+        if self.closed:
+            return
+        _U64.pack_into(self.shm.buf, 0, 1)
+        self.collector.join()
+        self._delivered = _U64.unpack_from(self.shm.buf, 8)[0]
+        self.closed = True
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _console_handlers():
+    from loggingFramework import ConsoleHandler
+    return [ConsoleHandler()]
+
+
+def _worker(handler, index):
+    from loggingFramework import Logger, LogLevel
+    logger = Logger(level=LogLevel.INFO, handlers=[handler], in_process=True)
+    for i in range(3):
+        logger.log(LogLevel.INFO, "worker %d request %d", index, i)
+    logger.flush()
+
+
+if __name__ == "__main__":
+    transport = SharedMemoryLogTransport(_console_handlers, producers=2)
+    workers = [multiprocessing.Process(target=_worker, args=(transport.producer(i), i)) for i in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    transport.close()
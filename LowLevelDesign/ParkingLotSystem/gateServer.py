@@ -0,0 +1,173 @@
+import asyncio
+import json
+from collections import deque
+
+from updatedParkingSystem import NearestToGateAllocation, ParkingLot, PeakHourPricing, Ticket, Vehicle, VehicleType
+
+
+# Asyncio Gate Server
+class GateServer:
+    """
+    Accepts entry and exit events from many gates over a socket and applies
+    them to one ParkingLot from a single event loop.
+
+    Protocol: one JSON object per line in each direction.
+        {"op": "enter", "gate": "north", "plate": "CAR-1", "type": "Car"}
+            -> {"ok": true, "ticket_id": "...", "level": 0, "spot": 4}
+        {"op": "exit", "ticket_id": "..."}
+            -> {"ok": true, "total_cost": 12.5}
+    Errors come back as {"ok": false, "error": "..."}, including for lines
+    that are not valid JSON, events with missing or unknown fields (or a
+    gate the lot's allocation strategy does not know) and events that fail
+    while being applied; the connection stays open.
+
+    Events that arrive during one event-loop tick are applied as a batch in
+    the next callback, exits first so the spots they free are reused at once.
+    When a vehicle type is full, entries queue at the barrier (up to
+    max_waiting per type) until an exit frees a spot. Beyond that the gate is
+    told the lot is full, which keeps waiting work bounded.
+    """
+    VEHICLE_TYPES = {vehicle_type.value: vehicle_type for vehicle_type in VehicleType}
+
+    def __init__(self, parking_lot, pricing_strategy, max_waiting=100):
+        self.parking_lot = parking_lot
+        self.pricing_strategy = pricing_strategy
+        self.max_waiting = max_waiting
+        # Only gate-aware strategies care which gate a vehicle came through
+        strategy = parking_lot.allocation_strategy
+        self.gate_ids = frozenset(strategy.gate_positions) if isinstance(strategy, NearestToGateAllocation) else None
+        self.tickets = {}
+        self.waiting = {vehicle_type: deque() for vehicle_type in VehicleType}
+        self._entries = []
+        self._exits = []
+        self._flush_scheduled = False
+        self.batches = 0
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()
+
+    async def start_unix(self, path):
+        self.server = await asyncio.start_unix_server(self.handle_connection, path)
+        return path
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    response = {"ok": False, "error": "invalid JSON"}
+                else:
+                    response = await self.handle_event(event)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def handle_event(self, event):
+        future = asyncio.get_running_loop().create_future()
+        error = self._validate(event)
+        if error:
+            future.set_result({"ok": False, "error": error})
+            return future
+        if event["op"] == "enter":
+            vehicle = Vehicle(event["plate"], self.VEHICLE_TYPES[event["type"]])
+            self._entries.append((vehicle, event.get("gate"), future))
+        else:
+            self._exits.append((event["ticket_id"], future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+        return future
+
+    def _validate(self, event):
+        """Why the event cannot be applied, or None if it is well formed."""
+        if not isinstance(event, dict):
+            return "event must be a JSON object"
+        op = event.get("op")
+        if op == "enter":
+            if not isinstance(event.get("plate"), str) or not event["plate"]:
+                return "missing plate"
+            if event.get("type") not in self.VEHICLE_TYPES:
+                return f"unknown vehicle type {event.get('type')!r}"
+            gate = event.get("gate")
+            if gate is not None and (not isinstance(gate, str) or (self.gate_ids is not None and gate not in self.gate_ids)):
+                return f"unknown gate {gate!r}"
+        elif op == "exit":
+            if not isinstance(event.get("ticket_id"), str):
+                return "missing ticket_id"
+        else:
+            return f"unknown op {op!r}"
+        return None
+
+    def _flush(self):
+        self._flush_scheduled = False
+        entries, self._entries = self._entries, []
+        exits, self._exits = self._exits, []
+        self.batches += 1
+        freed_types = set()
+        for ticket_id, future in exits:
+            ticket = self.tickets.pop(ticket_id, None)
+            if ticket is None:
+                self._resolve(future, {"ok": False, "error": "unknown ticket"})
+                continue
+            try:
+                total_cost = ticket.process_exit()
+                self.parking_lot.release_parking_spot(ticket.level_id, ticket.spot_id)
+            except Exception as e:
+                # One failing event must not strand the rest of the batch
+                self._resolve(future, {"ok": False, "error": str(e)})
+                continue
+            freed_types.add(ticket.vehicle.vehicle_type)
+            self._resolve(future, {"ok": True, "total_cost": total_cost})
+        # Vehicles already waiting at the barrier go before new arrivals
+        for vehicle_type in freed_types:
+            waiting = self.waiting[vehicle_type]
+            while waiting and self._try_park(*waiting[0]):
+                waiting.popleft()
+        for vehicle, gate_id, future in entries:
+            if self.waiting[vehicle.vehicle_type] or not self._try_park(vehicle, gate_id, future):
+                if len(self.waiting[vehicle.vehicle_type]) >= self.max_waiting:
+                    self._resolve(future, {"ok": False, "error": "lot full"})
+                else:
+                    self.waiting[vehicle.vehicle_type].append((vehicle, gate_id, future))
+
+    def _try_park(self, vehicle, gate_id, future):
+        """False if no spot is free; a failed attempt answers the gate and counts as handled."""
+        if future.done():  # client went away while waiting
+            return True
+        try:
+            level_id, spot_id = self.parking_lot.find_parking_spot(vehicle, gate_id)
+            if spot_id is None:
+                return False
+            ticket = Ticket(vehicle, level_id, spot_id, self.pricing_strategy)
+        except Exception as e:
+            future.set_result({"ok": False, "error": str(e)})
+            return True
+        self.tickets[ticket.ticket_id] = ticket
+        future.set_result({"ok": True, "ticket_id": ticket.ticket_id, "level": level_id, "spot": spot_id})
+        return True
+
+    @staticmethod
+    def _resolve(future, response):
+        if not future.done():
+            future.set_result(response)
+
+
+async def main(host="127.0.0.1", port=8765):
+    server = GateServer(ParkingLot(3, spots_per_level=300), PeakHourPricing(base_rate=5, peak_rate=10))
+    address = await server.start(host, port)
+    print(f"Gate server listening on {address[0]}:{address[1]}")
+    await server.server.serve_forever()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,556 @@
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from updatedParkingSystem import (
+    FirstFreeAllocation, NearestToGateAllocation, ParkingLevel, ParkingLot, ParkingSpot,
+    PeakHourPricing, SpotStatus, Vehicle, VehicleType,
+)
+from gateServer import GateServer
+from parkingFederation import ParkingFederation
+from parkingMetrics import render_prometheus
+from reservations import ReservationBook
+from ticketStore import TicketStore
+
+
+# Reference implementation of the original linear-scan level, kept only for comparison
+class LinearScanParkingLevel:
+    def __init__(self, level_id, num_spots):
+        self.level_id = level_id
+        self.spots = [ParkingSpot(i, VehicleType.CAR if i % 3 == 1 else VehicleType.MOTORCYCLE if i % 3 == 2 else VehicleType.TRUCK) for i in range(num_spots)]
+        self.lock = threading.Lock()
+
+    def find_available_spot(self, vehicle_type):
+        with self.lock:
+            for spot in self.spots:
+                if spot.status == SpotStatus.AVAILABLE and spot.spot_type == vehicle_type:
+                    return spot
+        return None
+
+    def park_vehicle(self, vehicle):
+        spot = self.find_available_spot(vehicle.vehicle_type)
+        if spot:
+            spot.assign_vehicle(vehicle)
+            return spot.spot_id
+        return None
+
+    def release_spot(self, spot_id):
+        with self.lock:
+            for spot in self.spots:
+                if spot.spot_id == spot_id:
+                    spot.release_spot()
+                    return True
+        return False
+
+
+def _fill_all_but_last(level, vehicle_type):
+    """Occupy every spot of the type except the last one (worst case for a scan)."""
+    ids = [spot.spot_id for spot in level.spots if spot.spot_type == vehicle_type]
+    for spot_id in ids[:-1]:
+        level.park_vehicle(Vehicle(f"FILL-{spot_id}", vehicle_type))
+
+
+def _fill_scan(level, vehicle_type):
+    # Assign directly: filling through park_vehicle would itself be O(n^2)
+    spots = [spot for spot in level.spots if spot.spot_type == vehicle_type]
+    for spot in spots[:-1]:
+        spot.assign_vehicle(Vehicle(f"FILL-{spot.spot_id}", vehicle_type))
+
+
+def benchmark_free_spot_index(sizes=(10, 1_000, 100_000)):
+    """Time one park + release cycle on a nearly full level, scan vs free-list."""
+    print(f"{'spots':>8} {'scan (us/op)':>14} {'index (us/op)':>14} {'speedup':>9}")
+    for num_spots in sizes:
+        results = {}
+        for name, level_cls, fill in (("scan", LinearScanParkingLevel, _fill_scan),
+                                      ("index", ParkingLevel, _fill_all_but_last)):
+            level = level_cls(0, num_spots)
+            vehicle = Vehicle("BENCH-1", VehicleType.CAR)
+            fill(level, VehicleType.CAR)
+            iterations = max(50, 2_000_000 // num_spots) if name == "scan" else 100_000
+            start = time.perf_counter()
+            for _ in range(iterations):
+                spot_id = level.park_vehicle(vehicle)
+                level.release_spot(spot_id)
+            results[name] = (time.perf_counter() - start) / iterations * 1e6
+        print(f"{num_spots:>8} {results['scan']:>14.2f} {results['index']:>14.2f} "
+              f"{results['scan'] / results['index']:>8.1f}x")
+
+
+# Reference lot that serializes every gate behind one mutex, as the original did
+class GlobalLockParkingLot(ParkingLot):
+    def __init__(self, levels, spots_per_level=10):
+        super().__init__(levels, spots_per_level)
+        self.lock = threading.Lock()
+
+    def find_parking_spot(self, vehicle):
+        with self.lock:
+            return super().find_parking_spot(vehicle)
+
+    def release_parking_spot(self, level_id, spot_id):
+        with self.lock:
+            return super().release_parking_spot(level_id, spot_id)
+
+
+def _gate_worker(lot, gate_id, ops, held, held_lock, errors):
+    vehicle_types = list(VehicleType)
+    for i in range(ops):
+        vehicle = Vehicle(f"G{gate_id}-{i}", vehicle_types[i % len(vehicle_types)])
+        level_id, spot_id = lot.find_parking_spot(vehicle)
+        if spot_id is None:
+            continue
+        key = (level_id, spot_id)
+        with held_lock:
+            if key in held:
+                errors.append(f"{key} double-assigned to {held[key]} and {vehicle.license_plate}")
+            held[key] = vehicle.license_plate
+        if lot.levels[level_id].spot_map[spot_id].vehicle is not vehicle:
+            errors.append(f"{key} overwritten while held by {vehicle.license_plate}")
+        with held_lock:
+            del held[key]
+        lot.release_parking_spot(level_id, spot_id)
+
+
+def benchmark_gate_contention(thread_counts=(1, 2, 4, 8, 16), ops_per_thread=20_000):
+    """Stress many gate threads against one lot and check no spot is ever handed out twice."""
+    print(f"{'threads':>8} {'global lock (ops/s)':>20} {'striped (ops/s)':>16} {'violations':>11}")
+    for threads in thread_counts:
+        results = {}
+        violations = 0
+        for name, lot_cls in (("global", GlobalLockParkingLot), ("striped", ParkingLot)):
+            # Fewer spots than gates so levels fill up and the full-level fast path is exercised
+            lot = lot_cls(levels=4, spots_per_level=max(3, threads))
+            held, held_lock, errors = {}, threading.Lock(), []
+            workers = [threading.Thread(target=_gate_worker, args=(lot, g, ops_per_thread, held, held_lock, errors))
+                       for g in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            results[name] = threads * ops_per_thread / (time.perf_counter() - start)
+            violations += len(errors)
+            # Every worker released what it parked, so the lot must be empty again
+            occupied = sum(spot.status == SpotStatus.OCCUPIED for level in lot.levels for spot in level.spots)
+            free = sum(sum(level.available_counts.values()) for level in lot.levels)
+            capacity = sum(len(level.spots) for level in lot.levels)
+            assert not occupied and free == capacity, \
+                f"{name} lot with {threads} threads: {occupied} spots still occupied, {free} free of {capacity}"
+        print(f"{threads:>8} {results['global']:>20,.0f} {results['striped']:>16,.0f} {violations:>11}")
+        assert violations == 0, f"{violations} spots handed out twice with {threads} threads"
+
+
+# Reference hour-by-hour pricing (with the hour overflow fixed), kept only for comparison
+class HourlyPeakHourPricing(PeakHourPricing):
+    def calculate_price(self, entry_time, exit_time, vehicle_type):
+        total_price = 0
+        current_time = entry_time
+        while current_time < exit_time:
+            total_price += self.peak_rate if self.is_peak_hour(current_time) else self.base_rate
+            current_time += timedelta(hours=1)
+        return round(total_price, 2)
+
+
+def benchmark_peak_pricing(num_tickets=5_000, max_stay_days=(1, 30)):
+    """Check the closed-form PeakHourPricing against the hourly model and time both."""
+    rng = random.Random(42)
+    # Weekday peaks only, with a longer evening window on Fridays
+    windows = {weekday: ((7, 10), (16, 19)) for weekday in range(4)}
+    windows[4] = ((7, 10), (15, 21))
+    print(f"{'max stay':>9} {'hourly (ms)':>12} {'closed (ms)':>12} {'speedup':>9} {'mismatches':>11}")
+    for days in max_stay_days:
+        stays = []
+        for _ in range(num_tickets):
+            entry = datetime(2024, 1, 1) + timedelta(seconds=rng.randrange(365 * 86400))
+            stays.append((entry, entry + timedelta(seconds=rng.randrange(days * 86400)), VehicleType.CAR))
+        timings, prices = {}, {}
+        for name, pricing_cls in (("hourly", HourlyPeakHourPricing), ("closed", PeakHourPricing)):
+            pricing = pricing_cls(base_rate=5, peak_rate=10, peak_windows=windows)
+            start = time.perf_counter()
+            prices[name] = pricing.calculate_prices_batch(stays)
+            timings[name] = (time.perf_counter() - start) * 1e3
+        mismatches = sum(a != b for a, b in zip(prices["hourly"], prices["closed"]))
+        print(f"{days:>8}d {timings['hourly']:>12.1f} {timings['closed']:>12.1f} "
+              f"{timings['hourly'] / timings['closed']:>8.1f}x {mismatches:>11}")
+
+
+def benchmark_nearest_to_gate(num_spots=100_000, spots_per_row=300, ops=50_000, occupancy=0.8):
+    """Churn a busy level from four gates; compare walking distance and cost per park."""
+    rows = num_spots // spots_per_row
+    gates = {"north": (spots_per_row // 2, 0), "south": (spots_per_row // 2, rows),
+             "west": (0, rows // 2), "east": (spots_per_row, rows // 2)}
+    print(f"{'strategy':>14} {'us/park+release':>16} {'avg walk':>9} {'last nearest':>13}")
+    for name, strategy in (("first-free", FirstFreeAllocation()), ("nearest-gate", NearestToGateAllocation(gates))):
+        rng = random.Random(7)
+        level = ParkingLevel(0, num_spots, strategy, spots_per_row)
+        parked = []
+        gate_ids = list(gates)
+        for i in range(int(level.available_counts[VehicleType.CAR] * occupancy)):
+            parked.append(level.park_vehicle(Vehicle(f"FILL-{i}", VehicleType.CAR), rng.choice(gate_ids)))
+        walked = 0
+        start = time.perf_counter()
+        for i in range(ops):
+            gate_id = rng.choice(gate_ids)
+            level.release_spot(parked.pop(rng.randrange(len(parked))))
+            spot_id = level.park_vehicle(Vehicle(f"BENCH-{i}", VehicleType.CAR), gate_id)
+            parked.append(spot_id)
+            gate_x, gate_y = gates[gate_id]
+            x, y = level.spot_map[spot_id].position
+            walked += abs(x - gate_x) + abs(y - gate_y)
+        elapsed = time.perf_counter() - start
+        # Spot-check the last allocation against a brute-force search
+        best = min(abs(spot.position[0] - gate_x) + abs(spot.position[1] - gate_y)
+                   for spot in level.spots
+                   if spot.spot_type == VehicleType.CAR and (spot.status == SpotStatus.AVAILABLE or spot.spot_id == spot_id))
+        is_nearest = abs(x - gate_x) + abs(y - gate_y) == best
+        print(f"{name:>14} {elapsed / ops * 1e6:>16.2f} {walked / ops:>9.1f} {str(is_nearest):>13}")
+    # A gate the strategy does not know is a caller error, not a missing heap
+    try:
+        level.park_vehicle(Vehicle("LOST-1", VehicleType.CAR), "no-such-gate")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown gate was not rejected")
+
+
+def benchmark_ticket_store(thread_counts=(1, 4, 16, 64), tickets_per_thread=500):
+    """Open and close tickets from many gate threads; group commit shares each fsync."""
+    print(f"{'threads':>8} {'ops/s':>10} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for threads in thread_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            store = TicketStore(directory, PeakHourPricing(base_rate=5, peak_rate=10))
+            latencies = [[] for _ in range(threads)]
+
+            def gate(gate_id):
+                for i in range(tickets_per_thread):
+                    start = time.perf_counter()
+                    ticket = store.open_ticket(Vehicle(f"G{gate_id}-{i}", VehicleType.CAR), 0, i)
+                    latencies[gate_id].append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    store.close_ticket(ticket.ticket_id)
+                    latencies[gate_id].append(time.perf_counter() - start)
+
+            workers = [threading.Thread(target=gate, args=(g,)) for g in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            store.close()
+        samples = sorted(latency for per_gate in latencies for latency in per_gate)
+        print(f"{threads:>8} {len(samples) / elapsed:>10,.0f} {samples[len(samples) // 2] * 1e3:>9.3f} "
+              f"{samples[int(len(samples) * 0.99)] * 1e3:>9.3f}")
+
+
+_CRASHING_GATE = """
+import sys, threading
+from updatedParkingSystem import PeakHourPricing, Vehicle, VehicleType
+from ticketStore import TicketStore
+store = TicketStore(sys.argv[1], PeakHourPricing(base_rate=5, peak_rate=10), snapshot_every=500)
+print_lock = threading.Lock()
+def gate(gate_id):
+    i = 0
+    while True:
+        ticket = store.open_ticket(Vehicle(f"G{gate_id}-{i}", VehicleType.CAR), 0, i)
+        if i % 2:
+            store.close_ticket(ticket.ticket_id)
+        with print_lock:
+            print(ticket.ticket_id, ticket.vehicle.license_plate, i % 2, flush=True)
+        i += 1
+for g in range(8):
+    threading.Thread(target=gate, args=(g,)).start()
+"""
+
+
+def benchmark_ticket_store_recovery(acked_before_kill=3_000):
+    """SIGKILL a process mid-ingest, tear the log tail, and check every acknowledged ticket survives."""
+    with tempfile.TemporaryDirectory() as directory:
+        child = subprocess.Popen([sys.executable, "-c", _CRASHING_GATE, directory],
+                                 stdout=subprocess.PIPE, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)))
+        acked = [child.stdout.readline().split() for _ in range(acked_before_kill)]
+        child.send_signal(signal.SIGKILL)
+        child.wait()
+        # Simulate a write torn by the crash
+        with open(os.path.join(directory, TicketStore.WAL_FILE), "ab") as f:
+            f.write(b'{"op":"open","ticket":{"ticket_id":"torn')
+
+        start = time.perf_counter()
+        store = TicketStore(directory, PeakHourPricing(base_rate=5, peak_rate=10))
+        recovery_ms = (time.perf_counter() - start) * 1e3
+        missing = [ticket_id for ticket_id, _, _ in acked if store.get(ticket_id) is None]
+        wrong_state = [ticket_id for ticket_id, plate, closed in acked
+                       if (store.find_by_plate(plate) is None) != (closed == "1")]
+        # The store must still accept writes after recovering from a torn log
+        store.open_ticket(Vehicle("AFTER-CRASH", VehicleType.CAR), 0, 0)
+        store.close()
+        reopened = TicketStore(directory, PeakHourPricing(base_rate=5, peak_rate=10))
+        after_crash_ok = reopened.find_by_plate("AFTER-CRASH") is not None
+        reopened.close()
+    print(f"acknowledged: {len(acked)}  recovered: {len(store.tickets)}  missing: {len(missing)}  "
+          f"wrong state: {len(wrong_state)}  writable after recovery: {after_crash_ok}  "
+          f"recovery: {recovery_ms:.1f} ms")
+    assert not missing, f"acknowledged tickets lost in the crash: {missing[:5]}"
+    assert not wrong_state, f"tickets recovered open/closed wrongly: {wrong_state[:5]}"
+    assert after_crash_ok, "store did not accept writes after recovery"
+
+
+def benchmark_ticket_store_snapshot(history=100_000, ops=6_000, snapshot_every=1_000):
+    """Commit latency across snapshots with a long closed-ticket history behind the store."""
+    with tempfile.TemporaryDirectory() as directory:
+        # A history of closed tickets, in the store's own record format
+        pricing = PeakHourPricing(base_rate=5, peak_rate=10)
+        exit_time = datetime.now().isoformat()
+        with open(os.path.join(directory, TicketStore.HISTORY_FILE), "w") as f:
+            for i in range(history):
+                f.write(json.dumps({"ticket_id": f"old-{i}", "license_plate": f"OLD-{i}", "vehicle_type": "Car",
+                                    "level_id": 0, "spot_id": i, "entry_time": exit_time,
+                                    "exit_time": exit_time, "total_cost": 5}) + "\n")
+        store = TicketStore(directory, pricing, snapshot_every=snapshot_every)
+        latencies = []
+        for i in range(ops // 2):
+            start = time.perf_counter()
+            ticket = store.open_ticket(Vehicle(f"SNAP-{i}", VehicleType.CAR), 0, i)
+            latencies.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            store.close_ticket(ticket.ticket_id)
+            latencies.append(time.perf_counter() - start)
+        store.close()
+        reopened = TicketStore(directory, pricing)
+        assert len(reopened.tickets) == history + ops // 2 and reopened.get("old-0") is not None
+        reopened.close()
+    latencies.sort()
+    print(f"{history:,} closed tickets in history, {ops // snapshot_every} snapshots: "
+          f"p50 {latencies[len(latencies) // 2] * 1e3:.3f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.3f} ms, "
+          f"max {latencies[-1] * 1e3:.1f} ms")
+
+
+def benchmark_spot_table(num_spots=1_000_000):
+    """Memory per spot and occupancy scan speed, ParkingSpot objects vs SpotTable columns."""
+    print(f"{'storage':>8} {'bytes/spot':>11} {'scan (ms)':>10} {'free cars':>10}")
+    for name, compact in (("objects", False), ("table", True)):
+        tracemalloc.start()
+        level = ParkingLevel(0, num_spots, compact=compact)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        for i in range(0, num_spots, 7):
+            spot = level.spots[i]
+            spot.assign_vehicle(Vehicle(f"FILL-{i}", spot.spot_type))
+        start = time.perf_counter()
+        if compact:
+            free_cars = level.spots.count(VehicleType.CAR, SpotStatus.AVAILABLE)
+        else:
+            free_cars = sum(1 for spot in level.spots
+                            if spot.spot_type == VehicleType.CAR and spot.status == SpotStatus.AVAILABLE)
+        scan_ms = (time.perf_counter() - start) * 1e3
+        print(f"{name:>8} {size / num_spots:>11.1f} {scan_ms:>10.1f} {free_cars:>10}")
+
+
+class _GateClient:
+    """One gate's connection; a gate handles one vehicle at a time."""
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.lock = asyncio.Lock()
+
+    async def send(self, event, latencies):
+        async with self.lock:
+            start = time.perf_counter()
+            self.writer.write((json.dumps(event) + "\n").encode())
+            response = json.loads(await self.reader.readline())
+            latencies.append(time.perf_counter() - start)
+            return response
+
+
+def _arrival_times(duration, peak_rate, rng):
+    """Morning-rush arrivals: a Gaussian bump over a base rate, sampled by thinning."""
+    arrivals, t = [], 0.0
+    while True:
+        t += rng.expovariate(peak_rate)
+        if t >= duration:
+            return arrivals
+        rate = 0.15 + 0.85 * math.exp(-((t - duration * 0.4) / (duration / 6)) ** 2)
+        if rng.random() < rate:
+            arrivals.append(t)
+
+
+async def _replay_arrivals(address, gates, duration, peak_rate, rng):
+    # Separate entry and exit gates: a car queued at an entry barrier must not block exits
+    entry_gates = [_GateClient(*await asyncio.open_connection(*address)) for _ in range(gates)]
+    exit_gates = [_GateClient(*await asyncio.open_connection(*address)) for _ in range(gates)]
+    latencies, rejected = [], 0
+    vehicle_types = [VehicleType.CAR, VehicleType.CAR, VehicleType.MOTORCYCLE, VehicleType.TRUCK]
+
+    async def vehicle(i, arrive_at):
+        nonlocal rejected
+        await asyncio.sleep(arrive_at)
+        response = await rng.choice(entry_gates).send({"op": "enter", "gate": None, "plate": f"V{i}",
+                                     "type": rng.choice(vehicle_types).value}, latencies)
+        if not response["ok"]:
+            rejected += 1
+            return
+        await asyncio.sleep(min(rng.expovariate(4 / duration), duration / 2))
+        await rng.choice(exit_gates).send({"op": "exit", "ticket_id": response["ticket_id"]}, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(vehicle(i, t) for i, t in enumerate(_arrival_times(duration, peak_rate, rng))))
+    elapsed = time.perf_counter() - start
+    for client in entry_gates + exit_gates:
+        client.writer.close()
+    return latencies, rejected, elapsed
+
+
+def benchmark_gate_server(gates=32, duration=5.0, peak_rate=4_000, spots_per_level=400):
+    """Replay a rush-hour arrival curve against the asyncio gate server over TCP."""
+    server = GateServer(ParkingLot(3, spots_per_level), PeakHourPricing(base_rate=5, peak_rate=10), max_waiting=50)
+    server_loop = asyncio.new_event_loop()
+    address = server_loop.run_until_complete(server.start())
+    thread = threading.Thread(target=server_loop.run_forever, daemon=True)
+    thread.start()
+    latencies, rejected, elapsed = asyncio.run(_replay_arrivals(address, gates, duration, peak_rate, random.Random(3)))
+    asyncio.run_coroutine_threadsafe(server.close(), server_loop).result()
+    server_loop.call_soon_threadsafe(server_loop.stop)
+    thread.join()
+    latencies.sort()
+    print(f"events: {len(latencies)}  events/s: {len(latencies) / elapsed:,.0f}  "
+          f"p50: {latencies[len(latencies) // 2] * 1e3:.2f} ms  p99: {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms  "
+          f"turned away (lot full): {rejected}  avg batch: {len(latencies) / server.batches:.1f} events")
+
+
+def benchmark_occupancy_poll(levels=5, spots_per_level=20_000, polls=200):
+    """Cost of one signage-board occupancy poll: full scan vs counters and Prometheus export."""
+    lot = ParkingLot(levels, spots_per_level)
+    for i in range(levels * spots_per_level // 2):
+        lot.find_parking_spot(Vehicle(f"FILL-{i}", list(VehicleType)[i % 3]))
+
+    def scan():
+        return {level.level_id: {vehicle_type: sum(1 for spot in level.spots
+                                                   if spot.spot_type == vehicle_type and spot.status == SpotStatus.OCCUPIED)
+                                 for vehicle_type in VehicleType}
+                for level in lot.levels}
+
+    counted = lot.occupancy()
+    assert {level_id: {t: occupied for t, (occupied, _) in by_type.items()} for level_id, by_type in counted.items()} == scan()
+    for name, poll in (("full scan", scan), ("counters", lot.occupancy), ("prometheus", lambda: render_prometheus(lot))):
+        start = time.perf_counter()
+        for _ in range(polls):
+            poll()
+        print(f"{name:>11}: {(time.perf_counter() - start) / polls * 1e3:9.3f} ms/poll")
+
+
+def benchmark_federation(worker_counts=(1, 2, 4, 8), sites=32, allocations=200_000, batch_size=20_000):
+    """Allocations/s through ParkingFederation as sites are spread over more worker processes."""
+    site_ids = [f"site-{i}" for i in range(sites)]
+    rng = random.Random(11)
+    vehicle_types = list(VehicleType)
+    requests = [(rng.choice(site_ids), Vehicle(f"V{i}", vehicle_types[i % 3])) for i in range(allocations)]
+    print(f"{'workers':>8} {'allocs/s':>10} {'unplaced':>9}")
+    for workers in worker_counts:
+        # Capacity roughly equals average demand, so busier sites fill up and
+        # their overflow takes the neighbour fallback
+        federation = ParkingFederation(site_ids, num_workers=workers, levels=3,
+                                       spots_per_level=allocations // sites // 3)
+        federation.occupancy()  # wait until every worker has built its lots
+        start = time.perf_counter()
+        placed = []
+        for offset in range(0, allocations, batch_size):
+            placed += federation.park_batch(requests[offset:offset + batch_size])
+        elapsed = time.perf_counter() - start
+        federation.close()
+        unplaced = sum(site_id is None for site_id, _, _ in placed)
+        print(f"{workers:>8} {allocations / elapsed:>10,.0f} {unplaced:>9}")
+
+
+def _reserve_by_scan(book, vehicle_type, start, end):
+    # Reference: test every spot's schedule for an overlapping booking
+    for key, schedule in book.schedules.items():
+        spot = book.parking_lot.levels[key[0]].spot_map[key[1]]
+        if spot.spot_type == vehicle_type and schedule.gap_around(start) and schedule.gap_around(start)[1] >= end:
+            return key
+    return None
+
+
+def benchmark_reservations(reservations=100_000, levels=3, spots_per_level=700, horizon_days=30, scan_sample=2_000):
+    """Book 100k random windows into a tight lot via the interval trees; compare with a per-spot scan."""
+    rng = random.Random(5)
+    windows = []
+    for _ in range(reservations):
+        start = rng.uniform(0, horizon_days * 86400)
+        windows.append((start, start + rng.uniform(3600, 8 * 3600)))
+
+    book = ReservationBook(ParkingLot(levels, spots_per_level))
+    start_time = time.perf_counter()
+    booked = sum(book.reserve(VehicleType.CAR, start, end) is not None for start, end in windows)
+    tree_us = (time.perf_counter() - start_time) / reservations * 1e6
+
+    # The scan is timed on the last bookings, against the book now holding ~100k
+    start_time = time.perf_counter()
+    scan_booked = sum(_reserve_by_scan(book, VehicleType.CAR, start, end) is not None for start, end in windows[-scan_sample:])
+    scan_us = (time.perf_counter() - start_time) / scan_sample * 1e6
+    tree_found = sum(book._find_spot(VehicleType.CAR, start, end) is not None for start, end in windows[-scan_sample:])
+    print(f"interval tree: {tree_us:8.1f} us/booking  ({booked:,} of {reservations:,} booked)")
+    print(f"spot scan:     {scan_us:8.1f} us/booking  (same answer on {scan_sample:,} late queries: {scan_booked == tree_found})")
+
+    # Walk-ins through the book still get the nearest spot for their gate
+    # that is free for the whole hold
+    spots_per_row, rows = 30, 20
+    gates = {"near": (0, 0), "far": (spots_per_row - 1, rows - 1)}
+    lot = ParkingLot(1, spots_per_row * rows, NearestToGateAllocation(gates))
+    book = ReservationBook(lot)
+    now = time.time()
+    for _ in range(60):
+        begin = now + rng.uniform(0, 8 * 3600)
+        book.reserve(VehicleType.CAR, begin, begin + 3600)
+    level = lot.levels[0]
+    hold_end = now + book.walk_in_hold
+    walk_ins, elapsed = 0, 0.0
+    for i in range(150):
+        gate_id = ("near", "far")[i % 2]
+        gate_x, gate_y = gates[gate_id]
+        free = []
+        for spot in level.spots:
+            gap = book.schedules[(0, spot.spot_id)].gap_around(now)
+            if spot.spot_type == VehicleType.CAR and spot.status == SpotStatus.AVAILABLE and gap and gap[1] >= hold_end:
+                free.append(abs(spot.position[0] - gate_x) + abs(spot.position[1] - gate_y))
+        start_time = time.perf_counter()
+        _, spot_id = book.park_walk_in(Vehicle(f"WALK-{i}", VehicleType.CAR), gate_id, now=now)
+        elapsed += time.perf_counter() - start_time
+        if not free:
+            assert spot_id is None
+            continue
+        x, y = level.spot_map[spot_id].position
+        assert abs(x - gate_x) + abs(y - gate_y) == min(free), (gate_id, spot_id)
+        walk_ins += 1
+    print(f"walk-ins:      {elapsed / 150 * 1e6:8.1f} us/walk-in  ({walk_ins} parked at the nearest free-for-hold spot of their gate)")
+
+
+BENCHMARKS = {
+    "free_spot_index": benchmark_free_spot_index,
+    "gate_contention": benchmark_gate_contention,
+    "peak_pricing": benchmark_peak_pricing,
+    "nearest_to_gate": benchmark_nearest_to_gate,
+    "ticket_store": benchmark_ticket_store,
+    "ticket_store_recovery": benchmark_ticket_store_recovery,
+    "ticket_store_snapshot": benchmark_ticket_store_snapshot,
+    "spot_table": benchmark_spot_table,
+    "gate_server": benchmark_gate_server,
+    "occupancy_poll": benchmark_occupancy_poll,
+    "federation": benchmark_federation,
+    "reservations": benchmark_reservations,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        print(f"\n== {name} ==")
+        BENCHMARKS[name]()
@@ -0,0 +1,165 @@
+import bisect
+import contextlib
+import hashlib
+import multiprocessing
+import threading
+
+from updatedParkingSystem import Car, ParkingLot, Vehicle, VehicleType
+
+
+# Consistent Hashing
+class ConsistentHashRing:
+    """
+    Hash ring with virtual nodes. Adding or removing a node only moves the
+    keys in the arcs it owned, instead of reshuffling every site.
+    """
+    def __init__(self, nodes, replicas=100):
+        self.replicas = replicas
+        self.ring = []  # sorted (hash, node)
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(str(key).encode()).digest()[:8], "big")
+
+    def add_node(self, node):
+        for replica in range(self.replicas):
+            bisect.insort(self.ring, (self._hash(f"{node}#{replica}"), node))
+
+    def remove_node(self, node):
+        self.ring = [(h, n) for h, n in self.ring if n != node]
+
+    def node_for(self, key):
+        index = bisect.bisect(self.ring, (self._hash(key),)) % len(self.ring)
+        return self.ring[index][1]
+
+
+# Site worker: owns the ParkingLot of every site hashed to it
+def _site_worker(conn, site_ids, levels, spots_per_level):
+    lots = {site_id: ParkingLot(levels, spots_per_level) for site_id in site_ids}
+    while True:
+        message = conn.recv()
+        op = message[0]
+        if op == "park_batch":
+            results = []
+            for site_id, license_plate, type_value in message[1]:
+                level_id, spot_id = lots[site_id].find_parking_spot(Vehicle(license_plate, VehicleType(type_value)))
+                results.append((level_id, spot_id) if spot_id is not None else None)
+            conn.send(results)
+        elif op == "release":
+            _, site_id, level_id, spot_id = message
+            conn.send(lots[site_id].release_parking_spot(level_id, spot_id))
+        elif op == "occupancy":
+            conn.send({site_id: lot.occupancy() for site_id, lot in lots.items()})
+        elif op == "stop":
+            conn.close()
+            return
+
+
+# Parking Federation
+class ParkingFederation:
+    """
+    One allocation API over many sites. Sites are sharded across worker
+    processes by consistent hashing on site id. Each worker owns its sites'
+    ParkingLot objects and is driven over a multiprocessing Pipe. A request
+    for a full site falls back to that site's neighbours in order.
+
+    neighbours maps site_id -> fallback site ids. It defaults to the next
+    sites in the order they were given.
+    """
+    def __init__(self, site_ids, num_workers=4, levels=3, spots_per_level=100, neighbours=None):
+        self.site_ids = list(site_ids)
+        self.ring = ConsistentHashRing(range(num_workers))
+        self.site_worker = {site_id: self.ring.node_for(site_id) for site_id in self.site_ids}
+        if neighbours is None:
+            count = len(self.site_ids)
+            neighbours = {site_id: [self.site_ids[(i + step) % count] for step in (1, 2)] if count > 1 else []
+                          for i, site_id in enumerate(self.site_ids)}
+        self.neighbours = neighbours
+
+        self.connections = []
+        self.processes = []
+        self.pipe_locks = []
+        for worker in range(num_workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            owned = [site_id for site_id, owner in self.site_worker.items() if owner == worker]
+            process = multiprocessing.Process(target=_site_worker, args=(child_conn, owned, levels, spots_per_level), daemon=True)
+            process.start()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+            self.pipe_locks.append(threading.Lock())
+
+    def _call(self, worker, message):
+        with self.pipe_locks[worker]:
+            self.connections[worker].send(message)
+            return self.connections[worker].recv()
+
+    def _candidates(self, site_id):
+        return [site_id] + [neighbour for neighbour in self.neighbours.get(site_id, []) if neighbour != site_id]
+
+    def park(self, site_id, vehicle):
+        """Returns (site_id, level_id, spot_id) of the spot taken, or (None, None, None)."""
+        return self.park_batch([(site_id, vehicle)])[0]
+
+    def park_batch(self, requests):
+        """
+        Park many (site_id, vehicle) requests. Each round sends one batch to
+        every worker involved before waiting on any reply, so workers allocate
+        in parallel. Requests whose site was full retry on the next neighbour
+        in the following round.
+        """
+        results = [(None, None, None)] * len(requests)
+        pending = [(index, self._candidates(site_id)) for index, (site_id, _) in enumerate(requests)]
+        while pending:
+            batches = {}
+            for index, candidates in pending:
+                batches.setdefault(self.site_worker[candidates[0]], []).append((index, candidates))
+            # Locks are always taken in worker order so concurrent callers cannot deadlock
+            batches = sorted(batches.items())
+            sent = []
+            with contextlib.ExitStack() as held:
+                try:
+                    for worker, batch in batches:
+                        held.enter_context(self.pipe_locks[worker])
+                        self.connections[worker].send(("park_batch", [
+                            (candidates[0], requests[index][1].license_plate, requests[index][1].vehicle_type.value)
+                            for index, candidates in batch]))
+                        sent.append((worker, batch))
+                finally:
+                    # Even if a later send failed, read the reply to every batch
+                    # sent so no pipe is left holding one for the next caller
+                    replies = [self.connections[worker].recv() for worker, _ in sent]
+            pending = []
+            for (_, batch), batch_replies in zip(sent, replies):
+                for (index, candidates), reply in zip(batch, batch_replies):
+                    if reply is not None:
+                        results[index] = (candidates[0], *reply)
+                    elif len(candidates) > 1:
+                        pending.append((index, candidates[1:]))
+        return results
+
+    def release(self, site_id, level_id, spot_id):
+        return self._call(self.site_worker[site_id], ("release", site_id, level_id, spot_id))
+
+    def occupancy(self):
+        merged = {}
+        for worker in range(len(self.connections)):
+            merged.update(self._call(worker, ("occupancy",)))
+        return merged
+
+    def close(self):
+        for worker, conn in enumerate(self.connections):
+            with self.pipe_locks[worker]:
+                conn.send(("stop",))
+        for process in self.processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    federation = ParkingFederation([f"site-{i}" for i in range(6)], num_workers=3, levels=1, spots_per_level=6)
+    print("Site placement:", federation.site_worker)
+    # site-0 has 2 car spots; later cars spill over to its neighbours
+    for i in range(5):
+        print(f"CAR-{i} ->", federation.park("site-0", Car(f"CAR-{i}")))
+    federation.close()
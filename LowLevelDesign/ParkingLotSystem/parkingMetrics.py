@@ -0,0 +1,96 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from updatedParkingSystem import ParkingLot
+
+
+# Prometheus Text Exporter
+def _histogram_lines(name, histogram, labels=""):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+    cumulative += histogram.counts[-1]
+    lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {cumulative}')
+    label_block = f"{{{labels.rstrip(',')}}}" if labels else ""
+    lines.append(f"{name}_sum{label_block} {histogram.total}")
+    lines.append(f"{name}_count{label_block} {cumulative}")
+    return lines
+
+
+def render_prometheus(parking_lot):
+    """
+    Render occupancy, allocation latency and lock wait in the Prometheus text
+    format. Everything comes from counters kept by the lot, so a scrape never
+    scans spots or takes a level lock.
+    """
+    lines = [
+        "# HELP parking_spots_capacity Number of spots per level and vehicle type.",
+        "# TYPE parking_spots_capacity gauge",
+    ]
+    occupancy = parking_lot.occupancy()
+    for level_id, by_type in occupancy.items():
+        for vehicle_type, (_, capacity) in by_type.items():
+            lines.append(f'parking_spots_capacity{{level="{level_id}",vehicle_type="{vehicle_type.value}"}} {capacity}')
+    lines += [
+        "# HELP parking_spots_occupied Number of occupied spots per level and vehicle type.",
+        "# TYPE parking_spots_occupied gauge",
+    ]
+    for level_id, by_type in occupancy.items():
+        for vehicle_type, (occupied, _) in by_type.items():
+            lines.append(f'parking_spots_occupied{{level="{level_id}",vehicle_type="{vehicle_type.value}"}} {occupied}')
+    lines += [
+        "# HELP parking_allocation_latency_seconds Time spent in ParkingLot.find_parking_spot.",
+        "# TYPE parking_allocation_latency_seconds histogram",
+    ]
+    lines += _histogram_lines("parking_allocation_latency_seconds", parking_lot.allocation_latency)
+    lines += [
+        "# HELP parking_lock_wait_seconds Time gates waited for a level's vehicle-type lock.",
+        "# TYPE parking_lock_wait_seconds histogram",
+    ]
+    for level in parking_lot.levels:
+        lines += _histogram_lines("parking_lock_wait_seconds", level.lock_wait, f'level="{level.level_id}",')
+    return "\n".join(lines) + "\n"
+
+
+# Metrics Endpoint
+class MetricsServer:
+    """Serves render_prometheus(parking_lot) at /metrics from a background thread."""
+    def __init__(self, parking_lot, host="127.0.0.1", port=9108):
+        lot = parking_lot
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_prometheus(lot).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self.httpd.server_address
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    from updatedParkingSystem import Car, Motorcycle
+
+    lot = ParkingLot(2, spots_per_level=30)
+    for i in range(12):
+        lot.find_parking_spot(Car(f"CAR-{i}") if i % 2 else Motorcycle(f"MOTO-{i}"))
+    print(render_prometheus(lot))
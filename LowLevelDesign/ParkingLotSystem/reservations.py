@@ -0,0 +1,358 @@
+import bisect
+import itertools
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from updatedParkingSystem import Car, ParkingLot, VehicleType
+
+INF = float("inf")
+
+
+# Interval Tree (treap ordered by start, augmented with the subtree's max end)
+class _Node:
+    __slots__ = ("key", "end", "value", "priority", "max_end", "left", "right")
+
+    def __init__(self, start, end, value):
+        self.key = (start, end, value)
+        self.end = end
+        self.value = value
+        self.priority = random.random()
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+    def update(self):
+        self.max_end = self.end
+        if self.left and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+class IntervalTree:
+    """
+    Set of [start, end) intervals, each tagged with a value, supporting insert,
+    remove and "find an interval that covers [start, end)" in O(log n) expected.
+    Values must be orderable; (start, end, value) is the treap key.
+    """
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    @staticmethod
+    def _split(node, key):
+        # Split into (< key, >= key)
+        if node is None:
+            return None, None
+        if node.key < key:
+            node.right, right = IntervalTree._split(node.right, key)
+            node.update()
+            return node, right
+        left, node.left = IntervalTree._split(node.left, key)
+        node.update()
+        return left, node
+
+    @staticmethod
+    def _merge(left, right):
+        if left is None or right is None:
+            return left or right
+        if left.priority > right.priority:
+            left.right = IntervalTree._merge(left.right, right)
+            left.update()
+            return left
+        right.left = IntervalTree._merge(left, right.left)
+        right.update()
+        return right
+
+    def insert(self, start, end, value):
+        node = _Node(start, end, value)
+        left, right = self._split(self.root, node.key)
+        self.root = self._merge(self._merge(left, node), right)
+        self.size += 1
+
+    def remove(self, start, end, value):
+        key = (start, end, value)
+        left, rest = self._split(self.root, key)
+        middle, right = self._split(rest, (start, end, value, None))  # just past key
+        if middle is not None:
+            self.size -= 1
+        self.root = self._merge(left, right)
+
+    def find_covering(self, start, end):
+        """Return (start, end, value) of some interval with s <= start and e >= end, or None."""
+        node = self.root
+        while node is not None:
+            if node.max_end < end:
+                return None
+            if node.key[0] <= start:
+                # Everything on the left starts early enough too; use it if it
+                # can reach far enough, otherwise this node or the right side
+                if node.left is not None and node.left.max_end >= end:
+                    node = node.left
+                    return self._any_reaching(node, end)
+                if node.end >= end:
+                    return node.key
+                node = node.right
+            else:
+                node = node.left
+        return None
+
+    @staticmethod
+    def _any_reaching(node, end):
+        # Every interval in this subtree starts early enough; find one ending late enough
+        while True:
+            if node.end >= end:
+                return node.key
+            node = node.left if node.left is not None and node.left.max_end >= end else node.right
+
+
+# Per-spot booking schedule
+class SpotSchedule:
+    """Disjoint bookings of one spot as a sorted list of (start, end, booking_id)."""
+    def __init__(self):
+        self.bookings = []
+
+    def gap_around(self, start):
+        """The free gap [gap_start, gap_end) that contains start, or None if start is booked."""
+        index = bisect.bisect_right(self.bookings, (start, INF))
+        gap_start = self.bookings[index - 1][1] if index else -INF
+        if gap_start > start:
+            return None
+        gap_end = self.bookings[index][0] if index < len(self.bookings) else INF
+        return gap_start, gap_end
+
+    def add(self, start, end, booking_id):
+        bisect.insort(self.bookings, (start, end, booking_id))
+
+    def remove(self, start, end, booking_id):
+        """Remove a booking; returns the neighbouring (prev_end, next_start) bounds."""
+        index = bisect.bisect_left(self.bookings, (start, end, booking_id))
+        del self.bookings[index]
+        prev_end = self.bookings[index - 1][1] if index else -INF
+        next_start = self.bookings[index][0] if index < len(self.bookings) else INF
+        return prev_end, next_start
+
+
+class Reservation:
+    def __init__(self, vehicle_type, start, end, level_id, spot_id):
+        self.reservation_id = str(uuid.uuid4())
+        self.vehicle_type = vehicle_type
+        self.start = start
+        self.end = end
+        self.level_id = level_id
+        self.spot_id = spot_id
+        self.booking = None  # (start, end, booking_id) in the spot's schedule
+        self.checked_in = False
+
+
+# Reservation Book
+class ReservationBook:
+    """
+    Advance bookings for a ParkingLot. Every spot keeps a SpotSchedule of its
+    booked windows, and each (level, vehicle type) has an IntervalTree of the
+    free gaps between bookings of its spots. "A free spot of type X for
+    [t1, t2)" is then one covering-interval query per level instead of a
+    check of every spot.
+
+    Walk-ins are routed through the book (ParkingLot.find_parking_spot calls
+    park_walk_in) and hold their spot for walk_in_hold, so a walk-in never
+    takes a spot booked within that horizon and a reservation never lands on a
+    spot a walk-in is expected to occupy. A walk-in still gets the spot the
+    lot's allocation strategy picks for its gate, skipping only spots booked
+    within the hold. A walk-in that overstays has its hold extended the next
+    time a search lands on its spot.
+
+    Locking follows the levels: one lock per (level, vehicle type), always
+    taken before that level's own type lock, so walk-ins of different levels
+    or types never wait for each other.
+    """
+    def __init__(self, parking_lot, walk_in_hold=timedelta(hours=4)):
+        self.parking_lot = parking_lot
+        self.walk_in_hold = walk_in_hold.total_seconds()
+        self.locks = {(level.level_id, vehicle_type): threading.Lock()
+                      for level in parking_lot.levels for vehicle_type in VehicleType}
+        self.schedules = {}
+        self.free_gaps = {(level.level_id, vehicle_type): IntervalTree()
+                          for level in parking_lot.levels for vehicle_type in VehicleType}
+        self.reservations = {}
+        self.holds = {}  # (level_id, spot_id) -> bookings held by the vehicle parked there
+        self._booking_ids = itertools.count()
+        for level in parking_lot.levels:
+            for spot in level.spots:
+                key = (level.level_id, spot.spot_id)
+                self.schedules[key] = SpotSchedule()
+                self.free_gaps[(level.level_id, spot.spot_type)].insert(-INF, INF, key)
+        parking_lot.reservation_book = self
+
+    @staticmethod
+    def _ts(moment):
+        return moment.timestamp() if isinstance(moment, datetime) else moment
+
+    # Gap bookkeeping (callers hold the lock of the spot's level and type)
+    def _book(self, vehicle_type, key, start, end):
+        schedule = self.schedules[key]
+        gap_start, gap_end = schedule.gap_around(start)
+        tree = self.free_gaps[(key[0], vehicle_type)]
+        tree.remove(gap_start, gap_end, key)
+        if gap_start < start:
+            tree.insert(gap_start, start, key)
+        if end < gap_end:
+            tree.insert(end, gap_end, key)
+        booking = (start, end, next(self._booking_ids))
+        schedule.add(*booking)
+        return booking
+
+    def _unbook(self, vehicle_type, key, booking):
+        start, end, _ = booking
+        prev_end, next_start = self.schedules[key].remove(*booking)
+        tree = self.free_gaps[(key[0], vehicle_type)]
+        if prev_end < start:
+            tree.remove(prev_end, start, key)
+        if end < next_start:
+            tree.remove(end, next_start, key)
+        tree.insert(prev_end, next_start, key)
+
+    def _find_spot_in_level(self, level_id, vehicle_type, start, end):
+        found = self.free_gaps[(level_id, vehicle_type)].find_covering(start, end)
+        return found[2] if found else None
+
+    def _find_spot(self, vehicle_type, start, end):
+        """Unlocked lookup across levels, for inspection."""
+        for level in self.parking_lot.levels:
+            key = self._find_spot_in_level(level.level_id, vehicle_type, start, end)
+            if key is not None:
+                return key
+        return None
+
+    # Reservations
+    def reserve(self, vehicle_type, start, end):
+        """Book a spot of the type for [start, end); returns a Reservation or None if none is free."""
+        start, end = self._ts(start), self._ts(end)
+        for level in self.parking_lot.levels:
+            with self.locks[(level.level_id, vehicle_type)]:
+                key = self._find_spot_in_level(level.level_id, vehicle_type, start, end)
+                if key is None:
+                    continue
+                reservation = Reservation(vehicle_type, start, end, *key)
+                reservation.booking = self._book(vehicle_type, key, start, end)
+                self.reservations[reservation.reservation_id] = reservation
+                return reservation
+        return None
+
+    def cancel(self, reservation_id):
+        reservation = self.reservations.get(reservation_id)
+        if reservation is None:
+            return False
+        with self.locks[(reservation.level_id, reservation.vehicle_type)]:
+            if reservation.checked_in or self.reservations.get(reservation_id) is not reservation:
+                return False
+            del self.reservations[reservation_id]
+            self._unbook(reservation.vehicle_type, (reservation.level_id, reservation.spot_id), reservation.booking)
+            return True
+
+    def check_in(self, reservation_id, vehicle, now=None):
+        """
+        Park a reserved vehicle in its booked spot; moves it if a walk-in
+        overstayed there. Returns (None, None) for an unknown or cancelled
+        reservation, one that is already checked in, or when no spot is free.
+        """
+        now = self._ts(now or datetime.now())
+        reservation = self.reservations.get(reservation_id)
+        if reservation is None:
+            return None, None
+        key = (reservation.level_id, reservation.spot_id)
+        with self.locks[(key[0], reservation.vehicle_type)]:
+            if reservation.checked_in or self.reservations.get(reservation_id) is not reservation:
+                return None, None
+            # Claimed under the lock, so a concurrent check-in or cancel fails
+            reservation.checked_in = True
+            if self.parking_lot.levels[key[0]].park_vehicle_at(vehicle, key[1]):
+                self.holds.setdefault(key, []).append(reservation.booking)
+                return key
+            self._unbook(reservation.vehicle_type, key, reservation.booking)
+        # Searched outside the spot's lock: _park_in_gap takes one level lock at a time
+        parked = self._park_in_gap(vehicle, now, max(reservation.end, now + 1))
+        if parked is None:
+            # Its booking is gone, so the reservation cannot be used again
+            self.reservations.pop(reservation_id, None)
+            return None, None
+        key, reservation.booking = parked
+        reservation.level_id, reservation.spot_id = key
+        return key
+
+    # Walk-ins
+    def park_walk_in(self, vehicle, gate_id=None, now=None):
+        """
+        Park a walk-in where the lot's allocation strategy would for its gate,
+        among the spots free for the whole walk_in_hold; returns (level_id, spot_id).
+        """
+        now = self._ts(now or datetime.now())
+        end = now + self.walk_in_hold
+        vehicle_type = vehicle.vehicle_type
+        for level in self.parking_lot.levels:
+            if not level.has_available_spot(vehicle_type):
+                continue
+            level_id = level.level_id
+            with self.locks[(level_id, vehicle_type)]:
+                # One tree query rules out levels booked solid for the hold
+                if self._find_spot_in_level(level_id, vehicle_type, now, end) is None:
+                    continue
+
+                def free_for_hold(spot):
+                    gap = self.schedules[(level_id, spot.spot_id)].gap_around(now)
+                    return gap is not None and gap[1] >= end
+
+                spot_id = level.park_vehicle(vehicle, gate_id, accept=free_for_hold)
+                if spot_id is not None:
+                    key = (level_id, spot_id)
+                    self.holds[key] = [self._book(vehicle_type, key, now, end)]
+                    return key
+        return None, None
+
+    def _park_in_gap(self, vehicle, start, end):
+        for level in self.parking_lot.levels:
+            with self.locks[(level.level_id, vehicle.vehicle_type)]:
+                parked = self._park_in_level_gap(level, vehicle, start, end)
+            if parked is not None:
+                return parked
+        return None
+
+    def _park_in_level_gap(self, level, vehicle, start, end):
+        while True:
+            key = self._find_spot_in_level(level.level_id, vehicle.vehicle_type, start, end)
+            if key is None:
+                return None
+            booking = self._book(vehicle.vehicle_type, key, start, end)
+            if level.park_vehicle_at(vehicle, key[1]):
+                self.holds[key] = [booking]
+                return key, booking
+            # Occupied past its hold: the booking just made extends that
+            # vehicle's hold, so the next search will not land here again
+            self.holds.setdefault(key, []).append(booking)
+
+    def release(self, level_id, spot_id):
+        key = (level_id, spot_id)
+        level = self.parking_lot.levels[level_id]
+        spot = level.spot_map.get(spot_id)
+        if spot is None:
+            return False
+        with self.locks[(level_id, spot.spot_type)]:
+            if not level.release_spot(spot_id):
+                return False
+            for booking in self.holds.pop(key, []):
+                self._unbook(spot.spot_type, key, booking)
+            return True
+
+if __name__ == "__main__":
+    lot = ParkingLot(1, spots_per_level=6)  # two car spots
+    book = ReservationBook(lot)
+    today = datetime.now().replace(minute=0, second=0, microsecond=0)
+    first = book.reserve(VehicleType.CAR, today + timedelta(hours=2), today + timedelta(hours=5))
+    second = book.reserve(VehicleType.CAR, today + timedelta(hours=3), today + timedelta(hours=4))
+    print("Reserved spots:", (first.level_id, first.spot_id), (second.level_id, second.spot_id))
+    print("Third booking overlapping both:", book.reserve(VehicleType.CAR, today + timedelta(hours=3), today + timedelta(hours=4)))
+    # Both car spots are booked within the walk-in hold, so a walk-in is turned away
+    print("Walk-in now:", lot.find_parking_spot(Car("WALK-IN-1")))
+    print("Check-in:", book.check_in(first.reservation_id, Car("RES-1"), now=today + timedelta(hours=2)))
@@ -0,0 +1,280 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from updatedParkingSystem import Ticket
+
+
+# Durable Ticket Store
+class TicketStore:
+    """
+    Keeps every Ticket in memory, indexed by ticket_id and by the license plate
+    of vehicles still parked, and makes each change durable in an append-only
+    write-ahead log before the caller gets it back.
+
+    Group commit: callers append their record to a pending batch and wait; a
+    single writer thread writes the whole batch and fsyncs once, so many gates
+    share the cost of one fsync.
+
+    Every `snapshot_every` records the log is rotated and a background thread
+    writes a snapshot, which bounds startup replay time. The snapshot holds
+    only the tickets still open. Tickets closed since the previous snapshot
+    are appended to a history file instead, so a snapshot costs the same
+    however long the history grows, and gates keep committing while it is
+    written.
+
+    If writing the log or a snapshot fails, the error is raised to every
+    caller waiting on it and to every later mutation.
+    """
+    WAL_FILE = "tickets.wal"
+    PREVIOUS_WAL_FILE = "tickets.wal.prev"
+    SNAPSHOT_FILE = "tickets.snapshot"
+    HISTORY_FILE = "tickets.history"
+
+    def __init__(self, directory, pricing_strategy, snapshot_every=10_000):
+        self.directory = directory
+        self.pricing_strategy = pricing_strategy
+        self.snapshot_every = snapshot_every
+        self.wal_path = os.path.join(directory, self.WAL_FILE)
+        self.previous_wal_path = os.path.join(directory, self.PREVIOUS_WAL_FILE)
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_FILE)
+        self.history_path = os.path.join(directory, self.HISTORY_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+        self.tickets = {}           # ticket_id -> Ticket
+        self.active_by_plate = {}   # license_plate -> Ticket, vehicles still parked
+        self.open_tickets = {}      # ticket_id -> Ticket, what a snapshot holds
+        self._closed_since_snapshot = []
+        self._recover()
+
+        self._wal = open(self.wal_path, "ab")
+        self._cond = threading.Condition()
+        self._pending = []
+        self._appended_seq = 0      # last record handed to the writer
+        self._durable_seq = 0       # last record fsynced to the log
+        self._records_since_snapshot = 0
+        self._snapshotter = None    # thread writing the current snapshot
+        self._error = None          # I/O error that stopped the writer or a snapshot
+        self._closing = False
+        self._writer = threading.Thread(target=self._write_batches, daemon=True)
+        self._writer.start()
+
+    # Lookups (O(1), no disk access)
+    def get(self, ticket_id):
+        return self.tickets.get(ticket_id)
+
+    def find_by_plate(self, license_plate):
+        return self.active_by_plate.get(license_plate)
+
+    # Mutations (return once the change is durable)
+    def open_ticket(self, vehicle, level_id, spot_id):
+        ticket = Ticket(vehicle, level_id, spot_id, self.pricing_strategy)
+        line = self._encode({"op": "open", "ticket": ticket.to_record()})
+        with self._cond:
+            self._wait_durable(self._enqueue(line, lambda: self._apply_open(ticket)))
+        return ticket
+
+    def close_ticket(self, ticket_id):
+        with self._cond:
+            # Check and close under the lock, so two gates cannot both close the ticket
+            self._check_writable()
+            ticket = self.tickets[ticket_id]
+            if ticket.exit_time is not None:
+                # Another gate may still be waiting for its close to be durable
+                self._wait_durable(self._appended_seq)
+                return ticket
+            ticket.process_exit()
+            line = self._encode({"op": "close", "ticket_id": ticket_id,
+                                 "exit_time": ticket.exit_time.isoformat(), "total_cost": ticket.total_cost})
+            self._wait_durable(self._enqueue(line, lambda: self._apply_close(ticket)))
+        return ticket
+
+    def close(self):
+        """Flush pending records and stop the writer thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._writer.join()
+        snapshotter = self._snapshotter
+        if snapshotter is not None:
+            snapshotter.join()
+        self._wal.close()
+
+    # Index maintenance, shared by live writes and recovery
+    def _apply_open(self, ticket):
+        self.tickets[ticket.ticket_id] = ticket
+        self.open_tickets[ticket.ticket_id] = ticket
+        self.active_by_plate[ticket.vehicle.license_plate] = ticket
+
+    def _apply_close(self, ticket):
+        self.open_tickets.pop(ticket.ticket_id, None)
+        if self.active_by_plate.get(ticket.vehicle.license_plate) is ticket:
+            del self.active_by_plate[ticket.vehicle.license_plate]
+        # A closed ticket never changes again, so the snapshotter can
+        # serialize it without the lock
+        self._closed_since_snapshot.append(ticket)
+
+    def _replay(self, entry):
+        # Replay is idempotent: a snapshot may already contain records that
+        # are still in the log
+        if entry["op"] == "open":
+            self._apply_open(Ticket.from_record(entry["ticket"], self.pricing_strategy))
+        elif entry["op"] == "close":
+            ticket = self.tickets[entry["ticket_id"]]
+            ticket.exit_time = datetime.fromisoformat(entry["exit_time"])
+            ticket.total_cost = entry["total_cost"]
+            self._apply_close(ticket)
+
+    # Group commit
+    @staticmethod
+    def _encode(entry):
+        return (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+
+    def _check_writable(self):
+        if self._error is not None:
+            raise self._error
+        if self._closing:
+            raise RuntimeError("TicketStore is closed")
+
+    def _enqueue(self, line, apply):
+        # Called with the lock held. Index update and enqueue happen together,
+        # so a snapshot never sees a record that is not also queued for the log
+        self._check_writable()
+        apply()
+        self._pending.append(line)
+        self._appended_seq += 1
+        self._cond.notify_all()
+        return self._appended_seq
+
+    def _wait_durable(self, seq):
+        while self._durable_seq < seq:
+            if self._error is not None:
+                raise self._error
+            self._cond.wait()
+
+    def _write_batches(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._pending and not self._closing:
+                        self._cond.wait()
+                    if not self._pending:
+                        return
+                    batch, self._pending = self._pending, []
+                    batch_seq = self._appended_seq
+                self._wal.write(b"".join(batch))
+                self._wal.flush()
+                os.fsync(self._wal.fileno())
+                with self._cond:
+                    self._durable_seq = batch_seq
+                    self._records_since_snapshot += len(batch)
+                    if self._records_since_snapshot >= self.snapshot_every and self._snapshotter is None:
+                        self._start_snapshot()
+                    self._cond.notify_all()
+        except OSError as error:
+            with self._cond:
+                self._error = error
+                self._cond.notify_all()
+
+    # Snapshots and recovery
+    def _start_snapshot(self):
+        # Called by the writer with the lock held, between batches. Only the
+        # open tickets are copied here; records still pending are already in
+        # the indexes, so the snapshot covers them too, and they replay
+        # harmlessly from the fresh log. Serializing happens on the
+        # snapshotter, so gates are not held up for it.
+        open_tickets = list(self.open_tickets.values())
+        closed, self._closed_since_snapshot = self._closed_since_snapshot, []
+        self._wal.close()
+        os.replace(self.wal_path, self.previous_wal_path)
+        self._wal = open(self.wal_path, "ab")
+        self._records_since_snapshot = 0
+        self._snapshotter = threading.Thread(target=self._write_snapshot, args=(open_tickets, closed), daemon=True)
+        self._snapshotter.start()
+
+    def _write_snapshot(self, open_tickets, closed):
+        try:
+            self._persist_snapshot(open_tickets, closed)
+            # The rotated log is only dropped once what replaces it is durable
+            os.remove(self.previous_wal_path)
+        except OSError as error:
+            with self._cond:
+                # The rotated log must survive, so no further rotation may run
+                self._error = error
+                self._cond.notify_all()
+            return
+        with self._cond:
+            self._snapshotter = None
+
+    def _persist_snapshot(self, open_tickets, closed):
+        if closed:
+            with open(self.history_path, "ab") as f:
+                f.write(b"".join(self._encode(ticket.to_record()) for ticket in closed))
+                f.flush()
+                os.fsync(f.fileno())
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump([self._open_record(ticket) for ticket in open_tickets], f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    @staticmethod
+    def _open_record(ticket):
+        # A gate may be closing the ticket while the snapshotter reads it;
+        # the snapshot records it as open, and the close replays from the log
+        # only if it became durable
+        return dict(ticket.to_record(), exit_time=None, total_cost=None)
+
+    def _load_record(self, record):
+        ticket = Ticket.from_record(record, self.pricing_strategy)
+        self.tickets[ticket.ticket_id] = ticket
+        active = self.active_by_plate.get(ticket.vehicle.license_plate)
+        if ticket.exit_time is None:
+            self.open_tickets[ticket.ticket_id] = ticket
+            self.active_by_plate[ticket.vehicle.license_plate] = ticket
+        else:
+            self.open_tickets.pop(ticket.ticket_id, None)
+            if active is not None and active.ticket_id == ticket.ticket_id:
+                del self.active_by_plate[ticket.vehicle.license_plate]
+
+    @staticmethod
+    def _read_lines(path):
+        """Parse a JSON-lines file, truncating a torn tail left by a crash mid-append."""
+        entries = []
+        valid_bytes = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn write; nothing after it was acknowledged
+                if not line.endswith(b"\n"):
+                    break
+                entries.append(entry)
+                valid_bytes += len(line)
+        # Drop the torn tail so new records are not appended after garbage
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+        return entries
+
+    def _recover(self):
+        # Older snapshots also hold closed tickets; _load_record handles both
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                for record in json.load(f):
+                    self._load_record(record)
+        if os.path.exists(self.history_path):
+            for record in self._read_lines(self.history_path):
+                self._load_record(record)
+        for path in (self.previous_wal_path, self.wal_path):
+            if os.path.exists(path):
+                for entry in self._read_lines(path):
+                    self._replay(entry)
+        if os.path.exists(self.previous_wal_path):
+            # A crash interrupted a snapshot: finish it, then both logs are covered
+            self._persist_snapshot(list(self.open_tickets.values()), self._closed_since_snapshot)
+            self._closed_since_snapshot = []
+            os.remove(self.previous_wal_path)
+            open(self.wal_path, "wb").close()
@@ -1,6 +1,9 @@
 from enum import Enum
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
 from datetime import datetime
+import heapq
 import threading
 import uuid
 import time
@@ -36,9 +39,10 @@ class Truck(Vehicle):
 
 # Parking Spot Class
 class ParkingSpot:
-    def __init__(self, spot_id, spot_type):
+    def __init__(self, spot_id, spot_type, position=(0, 0)):
         self.spot_id = spot_id
         self.spot_type = spot_type
+        self.position = position  # (x, y) on the level floor plan
         self.status = SpotStatus.AVAILABLE
         self.vehicle = None
 
@@ -53,52 +57,416 @@ class ParkingSpot:
         self.vehicle = None
         self.status = SpotStatus.AVAILABLE
 
+# Columnar Spot Storage
+class SpotTable:
+    """
+    Column-oriented storage for a level's spots, for deployments with millions
+    of spots. Spot type and status are one byte each, the vehicle is an index
+    into a shared vehicle table (-1 when empty) and the position is two ints,
+    all held in contiguous arrays instead of one Python object per spot.
+
+    Behaves like the list of ParkingSpot objects it replaces: indexing by
+    spot_id or iterating yields TableParkingSpot views created on demand.
+    """
+    VEHICLE_TYPES = list(VehicleType)
+    STATUSES = list(SpotStatus)
+
+    def __init__(self, spot_types, positions):
+        type_codes = {vehicle_type: code for code, vehicle_type in enumerate(self.VEHICLE_TYPES)}
+        available = self.STATUSES.index(SpotStatus.AVAILABLE)
+        self.types = array('b', (type_codes[spot_type] for spot_type in spot_types))
+        self.statuses = array('b', bytes([available]) * len(self.types))
+        self.vehicle_slots = array('l', [-1]) * len(self.types)
+        self.xs = array('i', (x for x, _ in positions))
+        self.ys = array('i', (y for _, y in positions))
+        # Vehicles of parked cars, with a free-list of reusable slots
+        self.vehicles = []
+        self.free_vehicle_slots = []
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, spot_id):
+        if not 0 <= spot_id < len(self.types):
+            raise IndexError(spot_id)
+        return TableParkingSpot(self, spot_id)
+
+    def __iter__(self):
+        return (TableParkingSpot(self, spot_id) for spot_id in range(len(self.types)))
+
+    def __reversed__(self):
+        return (TableParkingSpot(self, spot_id) for spot_id in range(len(self.types) - 1, -1, -1))
+
+    def get(self, spot_id, default=None):
+        return self[spot_id] if 0 <= spot_id < len(self.types) else default
+
+    def count(self, vehicle_type=None, status=None):
+        """Count spots by type and/or status with a scan over the byte columns."""
+        type_code = self.VEHICLE_TYPES.index(vehicle_type) if vehicle_type else None
+        status_code = self.STATUSES.index(status) if status else None
+        if type_code is None:
+            return len(self.statuses) if status_code is None else self.statuses.count(status_code)
+        if status_code is None:
+            return self.types.count(type_code)
+        return sum(1 for t, s in zip(self.types, self.statuses) if t == type_code and s == status_code)
+
+class TableParkingSpot(ParkingSpot):
+    """Thin ParkingSpot view over one row of a SpotTable."""
+    __slots__ = ("table", "spot_id")
+
+    def __init__(self, table, spot_id):
+        self.table = table
+        self.spot_id = spot_id
+
+    @property
+    def spot_type(self):
+        return SpotTable.VEHICLE_TYPES[self.table.types[self.spot_id]]
+
+    @property
+    def position(self):
+        return self.table.xs[self.spot_id], self.table.ys[self.spot_id]
+
+    @property
+    def status(self):
+        return SpotTable.STATUSES[self.table.statuses[self.spot_id]]
+
+    @status.setter
+    def status(self, status):
+        self.table.statuses[self.spot_id] = SpotTable.STATUSES.index(status)
+
+    @property
+    def vehicle(self):
+        slot = self.table.vehicle_slots[self.spot_id]
+        return self.table.vehicles[slot] if slot >= 0 else None
+
+    @vehicle.setter
+    def vehicle(self, vehicle):
+        table = self.table
+        slot = table.vehicle_slots[self.spot_id]
+        if slot >= 0:
+            table.vehicles[slot] = None
+            table.free_vehicle_slots.append(slot)
+            table.vehicle_slots[self.spot_id] = -1
+        if vehicle is not None:
+            if table.free_vehicle_slots:
+                slot = table.free_vehicle_slots.pop()
+                table.vehicles[slot] = vehicle
+            else:
+                slot = len(table.vehicles)
+                table.vehicles.append(vehicle)
+            table.vehicle_slots[self.spot_id] = slot
+
+# Spot Allocation Strategy (Strategy Pattern)
+# A strategy builds one free-spot index per level. The level calls the index
+# while holding the lock of the vehicle type involved, so indexes need no locking.
+class SpotAllocationStrategy(ABC):
+    @abstractmethod
+    def build_index(self, spots):
+        pass
+
+class FreeSpotIndex(ABC):
+    @abstractmethod
+    def peek(self, vehicle_type, gate_id=None):
+        pass
+
+    @abstractmethod
+    def take(self, vehicle_type, gate_id=None):
+        pass
+
+    @abstractmethod
+    def put_back(self, spot):
+        pass
+
+class FirstFreeAllocation(SpotAllocationStrategy):
+    def build_index(self, spots):
+        return FreeListIndex(spots)
+
+class FreeListIndex(FreeSpotIndex):
+    """
+    Free-list (used as a stack) of spot ids per vehicle type; O(1) take and put_back.
+    A spot parked directly (ParkingLevel.park_vehicle_at) stays on the stack
+    and is skipped lazily by take; in_free_list keeps put_back from pushing
+    the same spot twice.
+    """
+    def __init__(self, spots):
+        self.spots = spots
+        self.in_free_list = bytearray(len(spots))
+        # Built in reverse so the lowest spot id is handed out first
+        self.free_spots = {vehicle_type: array('l') for vehicle_type in VehicleType}
+        for spot in reversed(spots):
+            self.free_spots[spot.spot_type].append(spot.spot_id)
+            self.in_free_list[spot.spot_id] = 1
+
+    def _discard_stale(self, vehicle_type):
+        free = self.free_spots[vehicle_type]
+        while free and self.spots[free[-1]].status != SpotStatus.AVAILABLE:
+            self.in_free_list[free.pop()] = 0
+        return free
+
+    def peek(self, vehicle_type, gate_id=None):
+        free = self._discard_stale(vehicle_type)
+        return self.spots[free[-1]] if free else None
+
+    def take(self, vehicle_type, gate_id=None):
+        free = self._discard_stale(vehicle_type)
+        if not free:
+            return None
+        spot_id = free.pop()
+        self.in_free_list[spot_id] = 0
+        return self.spots[spot_id]
+
+    def put_back(self, spot):
+        if not self.in_free_list[spot.spot_id]:
+            self.free_spots[spot.spot_type].append(spot.spot_id)
+            self.in_free_list[spot.spot_id] = 1
+
+class NearestToGateAllocation(SpotAllocationStrategy):
+    def __init__(self, gate_positions):
+        # gate_id -> (x, y) where the gate's ramp reaches each level
+        self.gate_positions = gate_positions
+
+    def build_index(self, spots):
+        return GateDistanceIndex(spots, self.gate_positions)
+
+class GateDistanceIndex(FreeSpotIndex):
+    """
+    One min-heap of (walking distance, spot_id) per gate and vehicle type.
+
+    A spot taken through one gate stays in the other gates' heaps and is
+    discarded lazily when it reaches their top while occupied. Each heap
+    holds a spot at most once (tracked in in_heap), so heaps never grow
+    beyond the number of spots and take/put_back stay O(log n) per gate.
+    gate_id=None means the first gate; an unknown gate_id raises ValueError.
+    """
+    def __init__(self, spots, gate_positions):
+        self.spots = spots
+        self.gate_ids = frozenset(gate_positions)
+        self.default_gate = next(iter(gate_positions))
+        self.distances = {}
+        self.heaps = {}
+        self.in_heap = {}
+        for gate_id, (gate_x, gate_y) in gate_positions.items():
+            for vehicle_type in VehicleType:
+                self.heaps[(gate_id, vehicle_type)] = []
+                self.in_heap[(gate_id, vehicle_type)] = set()
+            for spot in spots:
+                x, y = spot.position
+                distance = abs(x - gate_x) + abs(y - gate_y)
+                self.distances[(gate_id, spot.spot_id)] = distance
+                self.heaps[(gate_id, spot.spot_type)].append((distance, spot.spot_id))
+                self.in_heap[(gate_id, spot.spot_type)].add(spot.spot_id)
+        for heap in self.heaps.values():
+            heapq.heapify(heap)
+
+    def _discard_stale(self, key):
+        heap = self.heaps[key]
+        while heap and self.spots[heap[0][1]].status != SpotStatus.AVAILABLE:
+            self.in_heap[key].discard(heapq.heappop(heap)[1])
+        return heap
+
+    def _key(self, gate_id, vehicle_type):
+        if gate_id is None:
+            return self.default_gate, vehicle_type
+        if gate_id not in self.gate_ids:
+            raise ValueError(f"unknown gate {gate_id!r}")
+        return gate_id, vehicle_type
+
+    def peek(self, vehicle_type, gate_id=None):
+        heap = self._discard_stale(self._key(gate_id, vehicle_type))
+        return self.spots[heap[0][1]] if heap else None
+
+    def take(self, vehicle_type, gate_id=None):
+        key = self._key(gate_id, vehicle_type)
+        heap = self._discard_stale(key)
+        if not heap:
+            return None
+        spot_id = heapq.heappop(heap)[1]
+        self.in_heap[key].discard(spot_id)
+        return self.spots[spot_id]
+
+    def put_back(self, spot):
+        for gate_id, vehicle_type in self.heaps:
+            key = (gate_id, vehicle_type)
+            if vehicle_type == spot.spot_type and spot.spot_id not in self.in_heap[key]:
+                heapq.heappush(self.heaps[key], (self.distances[(gate_id, spot.spot_id)], spot.spot_id))
+                self.in_heap[key].add(spot.spot_id)
+
+# Latency Histogram (for metrics export)
+class LatencyHistogram:
+    """
+    Cumulative-style latency histogram in seconds, Prometheus bucket layout.
+    observe() takes no lock so it never adds contention to the gates; under
+    heavy thread switching an increment can occasionally be lost, which is
+    acceptable for monitoring.
+    """
+    DEFAULT_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+
+    def count(self):
+        return sum(self.counts)
+
 # Parking Level Class
 class ParkingLevel:
-    def __init__(self, level_id, num_spots):
+    def __init__(self, level_id, num_spots, allocation_strategy=None, spots_per_row=10, compact=False):
+        """
+        Spot ids are 0..num_spots-1 and double as the index into self.spots.
+        With compact=True the spots live in a SpotTable instead of one
+        ParkingSpot object each.
+        """
         self.level_id = level_id
-        self.spots = [ParkingSpot(i, VehicleType.CAR if i % 3 == 1 else VehicleType.MOTORCYCLE if i % 3 == 2 else VehicleType.TRUCK) for i in range(num_spots)]
-        self.lock = threading.Lock()
-
-    def find_available_spot(self, vehicle_type):
-        with self.lock:
-            for spot in self.spots:
-                if spot.status == SpotStatus.AVAILABLE and spot.spot_type == vehicle_type:
-                    return spot
-        return None
+        spot_types = [VehicleType.CAR if i % 3 == 1 else VehicleType.MOTORCYCLE if i % 3 == 2 else VehicleType.TRUCK for i in range(num_spots)]
+        positions = [(i % spots_per_row, i // spots_per_row) for i in range(num_spots)]
+        if compact:
+            self.spots = SpotTable(spot_types, positions)
+            # The table is already addressable by spot_id
+            self.spot_map = self.spots
+        else:
+            self.spots = [ParkingSpot(i, spot_types[i], positions[i]) for i in range(num_spots)]
+            # spot_id -> ParkingSpot, so release never has to walk the spots list
+            self.spot_map = {spot.spot_id: spot for spot in self.spots}
+        # Free spots are tracked by the allocation strategy's index
+        self.spot_index = (allocation_strategy or FirstFreeAllocation()).build_index(self.spots)
+        # One lock per vehicle type: a car gate and a truck gate never contend
+        self.type_locks = {vehicle_type: threading.Lock() for vehicle_type in VehicleType}
+        # Free spot count per type. Only written under the type lock; read without
+        # it by ParkingLot as a cheap hint to skip full levels.
+        self.available_counts = {vehicle_type: 0 for vehicle_type in VehicleType}
+        for spot_type in spot_types:
+            self.available_counts[spot_type] += 1
+        self.capacity_counts = dict(self.available_counts)
+        # Time gates spend waiting for a type lock
+        self.lock_wait = LatencyHistogram()
+
+    def _acquire_type_lock(self, vehicle_type):
+        lock = self.type_locks[vehicle_type]
+        if lock.acquire(blocking=False):
+            self.lock_wait.observe(0.0)
+        else:
+            start = time.perf_counter()
+            lock.acquire()
+            self.lock_wait.observe(time.perf_counter() - start)
+        return lock
+
+    def occupancy(self, vehicle_type):
+        """(occupied, capacity) for the vehicle type, from counters rather than a scan."""
+        capacity = self.capacity_counts[vehicle_type]
+        return capacity - self.available_counts[vehicle_type], capacity
+
+    def has_available_spot(self, vehicle_type):
+        # Lock-free read; may be stale, park_vehicle re-checks under the lock
+        return self.available_counts[vehicle_type] > 0
+
+    def find_available_spot(self, vehicle_type, gate_id=None):
+        """Return the spot the strategy would hand out next, without reserving it."""
+        with self.type_locks[vehicle_type]:
+            return self.spot_index.peek(vehicle_type, gate_id)
 
-    def park_vehicle(self, vehicle):
-        spot = self.find_available_spot(vehicle.vehicle_type)
-        if spot:
-            spot.assign_vehicle(vehicle)
-            return spot.spot_id
+    def park_vehicle(self, vehicle, gate_id=None, accept=None):
+        """
+        Park in the spot the strategy picks for the gate. accept, if given,
+        vetoes spots (e.g. ones booked soon); the next best spot is tried and
+        vetoed spots go back into the index in their original order.
+        """
+        # Take and assign under the same lock so two gates can never get the same spot
+        lock = self._acquire_type_lock(vehicle.vehicle_type)
+        try:
+            spot = self.spot_index.take(vehicle.vehicle_type, gate_id)
+            if accept is not None:
+                vetoed = []
+                while spot is not None and not accept(spot):
+                    vetoed.append(spot)
+                    spot = self.spot_index.take(vehicle.vehicle_type, gate_id)
+                for vetoed_spot in reversed(vetoed):
+                    self.spot_index.put_back(vetoed_spot)
+            if spot:
+                spot.assign_vehicle(vehicle)
+                self.available_counts[vehicle.vehicle_type] -= 1
+                return spot.spot_id
+        finally:
+            lock.release()
         return None
 
+    def park_vehicle_at(self, vehicle, spot_id):
+        """Park in a specific spot (e.g. a reserved one); False if it is taken or the wrong type."""
+        spot = self.spot_map.get(spot_id)
+        if spot is None or spot.spot_type != vehicle.vehicle_type:
+            return False
+        lock = self._acquire_type_lock(spot.spot_type)
+        try:
+            if not spot.assign_vehicle(vehicle):
+                return False
+            # The strategy's index drops the spot lazily when it reaches it
+            self.available_counts[spot.spot_type] -= 1
+            return True
+        finally:
+            lock.release()
+
     def release_spot(self, spot_id):
-        with self.lock:
-            for spot in self.spots:
-                if spot.spot_id == spot_id:
-                    spot.release_spot()
-                    return True
-        return False
+        spot = self.spot_map.get(spot_id)
+        if spot is None:
+            return False
+        lock = self._acquire_type_lock(spot.spot_type)
+        try:
+            if spot.status == SpotStatus.OCCUPIED:
+                spot.release_spot()
+                self.spot_index.put_back(spot)
+                self.available_counts[spot.spot_type] += 1
+            return True
+        finally:
+            lock.release()
 
 # Parking Lot Class
 class ParkingLot:
-    def __init__(self, levels):
-        self.levels = [ParkingLevel(i, 10) for i in range(levels)]
-        self.lock = threading.Lock()
-
-    def find_parking_spot(self, vehicle):
-        with self.lock:
-            for level in self.levels:
-                spot_id = level.park_vehicle(vehicle)
-                if spot_id is not None:
-                    return level.level_id, spot_id
-        return None, None
+    def __init__(self, levels, spots_per_level=10, allocation_strategy=None, compact=False):
+        """
+        allocation_strategy decides which free spot a level hands out, e.g.
+        NearestToGateAllocation to park each vehicle as close as possible to
+        the gate it came in through. Defaults to FirstFreeAllocation.
+        compact stores each level's spots in a SpotTable.
+        """
+        self.allocation_strategy = allocation_strategy or FirstFreeAllocation()
+        self.levels = [ParkingLevel(i, spots_per_level, self.allocation_strategy, compact=compact) for i in range(levels)]
+        self.allocation_latency = LatencyHistogram()
+        # Set by ReservationBook; walk-ins then go through it so they never
+        # take a spot that is booked in the near future
+        self.reservation_book = None
+
+    def find_parking_spot(self, vehicle, gate_id=None):
+        # No lot-wide lock: each level serializes only gates parking the same
+        # vehicle type, and full levels are skipped without taking any lock.
+        start = time.perf_counter()
+        result = None, None
+        if self.reservation_book is not None:
+            result = self.reservation_book.park_walk_in(vehicle, gate_id)
+            self.allocation_latency.observe(time.perf_counter() - start)
+            return result
+        for level in self.levels:
+            if not level.has_available_spot(vehicle.vehicle_type):
+                continue
+            spot_id = level.park_vehicle(vehicle, gate_id)
+            if spot_id is not None:
+                result = level.level_id, spot_id
+                break
+        self.allocation_latency.observe(time.perf_counter() - start)
+        return result
+
+    def occupancy(self):
+        """{level_id: {VehicleType: (occupied, capacity)}}, read from counters without locking."""
+        return {level.level_id: {vehicle_type: level.occupancy(vehicle_type) for vehicle_type in VehicleType}
+                for level in self.levels}
 
     def release_parking_spot(self, level_id, spot_id):
-        with self.lock:
-            return self.levels[level_id].release_spot(spot_id)
+        if self.reservation_book is not None:
+            return self.reservation_book.release(level_id, spot_id)
+        return self.levels[level_id].release_spot(spot_id)
 
 # Pricing Strategy (Strategy Pattern)
 class PricingStrategy(ABC):
@@ -106,6 +474,11 @@ class PricingStrategy(ABC):
     def calculate_price(self, entry_time, exit_time, vehicle_type):
         pass
 
+    def calculate_prices_batch(self, stays):
+        """Price many (entry_time, exit_time, vehicle_type) stays, e.g. for end-of-day reconciliation."""
+        return [self.calculate_price(entry_time, exit_time, vehicle_type)
+                for entry_time, exit_time, vehicle_type in stays]
+
 class FlatRatePricing(PricingStrategy):
     def __init__(self, rate_per_hour):
         self.rate_per_hour = rate_per_hour
@@ -115,29 +488,80 @@ class FlatRatePricing(PricingStrategy):
         return round(duration_hours * self.rate_per_hour, 2)
 
 class PeakHourPricing(PricingStrategy):
-    def __init__(self, base_rate, peak_rate):
+    # Peak hours as [start_hour, end_hour) windows: 8-10am and 5-7pm inclusive
+    DEFAULT_PEAK_WINDOWS = ((8, 11), (17, 20))
+
+    def __init__(self, base_rate, peak_rate, peak_windows=None):
+        """
+        peak_windows maps weekday (0 = Monday) to a list of [start_hour, end_hour)
+        windows. Weekdays that are missing have no peak hours. When omitted,
+        DEFAULT_PEAK_WINDOWS applies every day.
+        """
         self.base_rate = base_rate
         self.peak_rate = peak_rate
+        if peak_windows is None:
+            peak_windows = {weekday: self.DEFAULT_PEAK_WINDOWS for weekday in range(7)}
+        self.peak_windows = peak_windows
+        # _peak_prefix[weekday][h] = number of peak hours in [0, h) on that weekday,
+        # so the peak hours inside any span of a day is a single subtraction.
+        self._peak_prefix = []
+        for weekday in range(7):
+            peak = [False] * 24
+            for start_hour, end_hour in peak_windows.get(weekday, ()):
+                for hour in range(max(0, start_hour), min(24, end_hour)):
+                    peak[hour] = True
+            prefix = [0]
+            for hour in range(24):
+                prefix.append(prefix[-1] + peak[hour])
+            self._peak_prefix.append(prefix)
+        self._peak_hours_per_week = sum(prefix[24] for prefix in self._peak_prefix)
+
+    def is_peak_hour(self, moment):
+        prefix = self._peak_prefix[moment.weekday()]
+        return prefix[moment.hour + 1] > prefix[moment.hour]
+
+    def _peak_hours_between(self, weekday, first_hour, last_hour):
+        prefix = self._peak_prefix[weekday % 7]
+        return prefix[last_hour + 1] - prefix[first_hour]
 
     def calculate_price(self, entry_time, exit_time, vehicle_type):
-        total_price = 0
-        current_time = entry_time
+        """
+        Every started hour is billed at the rate of the hour of day it starts in.
+        Rather than stepping hour by hour, the billed hours are intersected with
+        the peak windows one calendar day at a time (whole weeks in one step),
+        so the cost is O(min(days, 7)) regardless of how long the vehicle stayed.
+        """
+        duration = exit_time - entry_time
+        duration_us = (duration.days * 86400 + duration.seconds) * 1_000_000 + duration.microseconds
+        if duration_us <= 0:
+            return 0
+        billed_hours = -(-duration_us // 3_600_000_000)
 
-        while current_time < exit_time:
-            hour = current_time.hour
-            total_price += self.peak_rate if 8 <= hour <= 10 or 17 <= hour <= 19 else self.base_rate
-            current_time = current_time.replace(hour=current_time.hour + 1)
+        # Billed hours start at entry.hour on day 0 and end at last_hour on last_day
+        weekday = entry_time.weekday()
+        first_hour = entry_time.hour
+        last_day, last_hour = divmod(first_hour + billed_hours - 1, 24)
+        if last_day == 0:
+            peak_hours = self._peak_hours_between(weekday, first_hour, last_hour)
+        else:
+            peak_hours = (self._peak_hours_between(weekday, first_hour, 23)
+                          + self._peak_hours_between(weekday + last_day, 0, last_hour))
+            full_weeks, extra_days = divmod(last_day - 1, 7)
+            peak_hours += full_weeks * self._peak_hours_per_week
+            for day in range(1, extra_days + 1):
+                peak_hours += self._peak_hours_between(weekday + day, 0, 23)
 
+        total_price = peak_hours * self.peak_rate + (billed_hours - peak_hours) * self.base_rate
         return round(total_price, 2)
 
 # Ticket Class
 class Ticket:
-    def __init__(self, vehicle, level_id, spot_id, pricing_strategy):
-        self.ticket_id = str(uuid.uuid4())
+    def __init__(self, vehicle, level_id, spot_id, pricing_strategy, ticket_id=None, entry_time=None):
+        self.ticket_id = ticket_id or str(uuid.uuid4())
         self.vehicle = vehicle
         self.level_id = level_id
         self.spot_id = spot_id
-        self.entry_time = datetime.now()
+        self.entry_time = entry_time or datetime.now()
         self.exit_time = None
         self.pricing_strategy = pricing_strategy
         self.total_cost = 0
@@ -156,14 +580,49 @@ class Ticket:
             "total_cost": self.total_cost,
         }
 
+    def to_record(self):
+        """Plain-dict form used by TicketStore for its log and snapshots."""
+        return {
+            "ticket_id": self.ticket_id,
+            "license_plate": self.vehicle.license_plate,
+            "vehicle_type": self.vehicle.vehicle_type.value,
+            "level_id": self.level_id,
+            "spot_id": self.spot_id,
+            "entry_time": self.entry_time.isoformat(),
+            "exit_time": self.exit_time.isoformat() if self.exit_time else None,
+            "total_cost": self.total_cost,
+        }
+
+    @classmethod
+    def from_record(cls, record, pricing_strategy):
+        vehicle = Vehicle(record["license_plate"], VehicleType(record["vehicle_type"]))
+        ticket = cls(vehicle, record["level_id"], record["spot_id"], pricing_strategy,
+                     ticket_id=record["ticket_id"], entry_time=datetime.fromisoformat(record["entry_time"]))
+        if record["exit_time"]:
+            ticket.exit_time = datetime.fromisoformat(record["exit_time"])
+        ticket.total_cost = record["total_cost"]
+        return ticket
+
 # Exit Gate Processing
 class ExitGate:
-    def __init__(self, gate_id, parking_lot):
+    def __init__(self, gate_id, parking_lot, ticket_store=None):
         self.gate_id = gate_id
         self.parking_lot = parking_lot
+        # Optional TicketStore; when set, exits are recorded durably and can be
+        # processed from the license plate alone
+        self.ticket_store = ticket_store
+
+    def process_exit_by_plate(self, license_plate):
+        ticket = self.ticket_store.find_by_plate(license_plate) if self.ticket_store else None
+        if ticket is None:
+            return False
+        return self.process_exit(ticket)
 
     def process_exit(self, ticket):
-        total_cost = ticket.process_exit()
+        if self.ticket_store:
+            total_cost = self.ticket_store.close_ticket(ticket.ticket_id).total_cost
+        else:
+            total_cost = ticket.process_exit()
         success = self.parking_lot.release_parking_spot(ticket.level_id, ticket.spot_id)
         if success:
             print(f"Vehicle {ticket.vehicle.license_plate} exited. Total charge: ${total_cost}")
@@ -0,0 +1,327 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from taskManagementConcurrent import TASK_COLUMNS, DatabaseManager, TaskManagementSystem, TaskQuery, logger, row_to_task
+
+logger.disabled = True
+
+
+# Reference implementation of the original manager, kept only for comparison:
+# a fresh connection per operation, all operations behind one global lock
+class LegacyDatabaseManager:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection_lock = threading.Lock()
+
+    @contextmanager
+    def get_connection(self):
+        with self.connection_lock:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    read_connection = get_connection
+
+
+def _seed(db_path, tasks):
+    manager = DatabaseManager(db_path)
+    with manager.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, description, due_date, priority, status) VALUES (?, ?, ?, ?, ?)",
+            ((f"Task {i}", f"Description {i}", "2024-12-31", "High", "Pending") for i in range(tasks)))
+    manager.close()
+
+
+def _mixed_ops(manager, threads, ops_per_thread, tasks, write_ratio):
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(ops_per_thread):
+            title = f"Task {rng.randrange(tasks)}"
+            if rng.random() < write_ratio:
+                with manager.get_connection() as conn:
+                    conn.execute("UPDATE tasks SET status = ?, updated_at = ? WHERE title = ?",
+                                 (rng.choice(("Pending", "Done")), time.time(), title))
+            else:
+                with manager.read_connection() as conn:
+                    conn.execute("SELECT * FROM tasks WHERE title = ?", (title,)).fetchall()
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return threads * ops_per_thread / (time.perf_counter() - start)
+
+
+def benchmark_connection_pool(thread_counts=(1, 2, 4, 8, 16, 32), total_ops=8_000, tasks=20_000, write_ratio=0.2):
+    """Mixed read/write ops/sec: connect-per-op behind a global lock vs the WAL writer + reader pool."""
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'threads':>8} {'legacy ops/s':>13} {'pooled ops/s':>13}")
+        for threads in thread_counts:
+            results = []
+            for name in ("legacy", "pooled"):
+                db_path = os.path.join(directory, f"{name}-{threads}.db")
+                _seed(db_path, tasks)
+                manager = LegacyDatabaseManager(db_path) if name == "legacy" else DatabaseManager(db_path)
+                results.append(_mixed_ops(manager, threads, total_ops // threads, tasks, write_ratio))
+                if name == "pooled":
+                    manager.close()
+            print(f"{threads:>8} {results[0]:>13,.0f} {results[1]:>13,.0f}")
+
+
+def _generated_tasks(count, offset=0):
+    for i in range(offset, offset + count):
+        # Titles arrive in no particular order, as from another tracker
+        yield {"title": f"Imported {i * 2654435761 % 1000003:07d}-{i}",
+               "description": f"Imported from tracker, row {i}", "due_date": "2024-12-31", "priority": ("Low", "Medium", "High")[i % 3], "status": "Pending"}
+
+
+def benchmark_bulk_import(single_rows=5_000, bulk_rows=500_000):
+    """Rows/sec: create_task in a loop vs create_tasks_bulk from a generator, with and without index deferral."""
+    with tempfile.TemporaryDirectory() as directory:
+        system = TaskManagementSystem(os.path.join(directory, "single.db"))
+        start = time.perf_counter()
+        for task in _generated_tasks(single_rows):
+            system.create_task(task["title"], task["description"], task["due_date"], task["priority"], task["status"])
+        print(f"{'create_task loop':>26}: {single_rows / (time.perf_counter() - start):>10,.0f} rows/s")
+        system.db_manager.close()
+
+        for defer in (False, True):
+            system = TaskManagementSystem(os.path.join(directory, f"bulk-{defer}.db"))
+            # Existing rows, so index upkeep during the import has a real cost
+            system.create_tasks_bulk(_generated_tasks(bulk_rows // 2, offset=bulk_rows), defer_indexes=False)
+            start = time.perf_counter()
+            ids = system.create_tasks_bulk(_generated_tasks(bulk_rows), defer_indexes=defer)
+            elapsed = time.perf_counter() - start
+            assert len(ids) == bulk_rows and ids == list(range(ids[0], ids[0] + bulk_rows))
+            with system.db_manager.read_connection() as conn:
+                assert conn.execute("SELECT title FROM tasks WHERE id = ?", (ids[-1],)).fetchone()[0] == \
+                    next(_generated_tasks(1, offset=bulk_rows - 1))["title"]
+            label = "bulk, indexes deferred" if defer else "bulk, indexes maintained"
+            print(f"{label:>26}: {bulk_rows / elapsed:>10,.0f} rows/s")
+            system.db_manager.close()
+
+
+WORDS = ("database", "migration", "login", "page", "report", "export", "billing", "invoice", "search", "cache",
+         "timeout", "mobile", "layout", "email", "queue", "deploy", "alert", "metrics", "backup", "upgrade")
+
+
+def _filter_page_tasks(count):
+    rng = random.Random(7)
+    for i in range(count):
+        words = rng.sample(WORDS, 3)
+        yield {"title": f"{words[0].capitalize()} {words[1]} task {i}",
+               "description": f"Investigate {words[2]} issue reported by customer {i % 977}",
+               "due_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+               "priority": rng.choice(("Low", "Medium", "High", "Critical")),
+               "status": rng.choice(("Pending", "In Progress", "Blocked", "Done")),
+               "assignee": f"user{rng.randrange(200)}"}
+
+
+def _is_full_scan(detail):
+    # "SCAN tasks" walks the whole table; "SCAN tasks USING INDEX ..." walks an index in order
+    return detail.startswith("SCAN tasks") and "USING" not in detail and "VIRTUAL TABLE" not in detail
+
+
+def benchmark_search(tasks=300_000):
+    """Filter-page queries: the old LIKE '%value%' scan vs the indexed query layer, with an EXPLAIN no-full-scan check."""
+    with tempfile.TemporaryDirectory() as directory:
+        system = TaskManagementSystem(os.path.join(directory, "search.db"))
+        system.create_tasks_bulk(_filter_page_tasks(tasks))
+        with system.db_manager.get_connection() as conn:
+            conn.execute("ANALYZE")
+
+        cases = (
+            ("assignee + status", TaskQuery(assignee="user7", status="Pending"),
+             {"assignee": "user7", "status": "Pending"}),
+            ("priority + status + due", TaskQuery(priority="High", status="Blocked", due_from="2024-03-01",
+                                                  due_to="2024-04-01"),
+             {"priority": "High", "status": "Blocked", "due_date": "2024-03"}),
+            ("text + status", TaskQuery(text="database migration", status="Pending"),
+             {"title": "database migration", "status": "Pending"}),
+        )
+        print(f"{'query':>24} {'LIKE scan (ms)':>15} {'first page (ms)':>16} {'plan':>6}")
+        for name, query, like_criteria in cases:
+            plan = system.explain_query(query)
+            assert not any(_is_full_scan(detail) for detail in plan), (name, plan)
+            start = time.perf_counter()
+            with system.db_manager.read_connection() as conn:
+                conn.execute(
+                    "SELECT * FROM tasks WHERE " + " AND ".join(f"{field} LIKE ?" for field in like_criteria),
+                    [f"%{value}%" for value in like_criteria.values()]).fetchall()
+            like_ms = (time.perf_counter() - start) * 1e3
+            start = time.perf_counter()
+            page, _ = system.query_tasks(query)
+            page_ms = (time.perf_counter() - start) * 1e3
+            print(f"{name:>24} {like_ms:>15.1f} {page_ms:>16.2f} {'index':>6}")
+
+        # Walk every page of one assignee with the keyset cursor
+        query = TaskQuery(assignee="user7", limit=100)
+        start = time.perf_counter()
+        seen = pages = 0
+        while True:
+            page, cursor = system.query_tasks(query)
+            seen += len(page)
+            pages += 1
+            if cursor is None:
+                break
+            query.after = cursor
+        walk_ms = (time.perf_counter() - start) * 1e3
+        with system.db_manager.read_connection() as conn:
+            expected = conn.execute("SELECT COUNT(*) FROM tasks WHERE assignee = 'user7'").fetchone()[0]
+        assert seen == expected
+        print(f"keyset walk: {seen:,} tasks in {pages} pages, {walk_ms / pages:.2f} ms/page")
+        system.db_manager.close()
+
+
+# Reference implementation of the original per-title lock dictionary, kept only for comparison
+class DictLockTaskManagementSystem(TaskManagementSystem):
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.task_locks = {}
+        self.global_lock = threading.Lock()
+
+    def _get_task_lock(self, title):
+        with self.global_lock:
+            if title not in self.task_locks:
+                self.task_locks[title] = threading.Lock()
+            return self.task_locks[title]
+
+
+def benchmark_task_locks(threads=16, ops_per_thread=500, titles=200_000):
+    """update_task throughput on disjoint vs overlapping titles, and lock-table memory after touching many titles."""
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'locks':>8} {'workload':>12} {'updates/s':>10}")
+        for name, cls in (("dict", DictLockTaskManagementSystem), ("striped", TaskManagementSystem)):
+            system = cls(os.path.join(directory, f"{name}.db"))
+            system.create_tasks_bulk({"title": f"Task {i}", "description": "", "due_date": "2024-12-31",
+                                      "priority": "Low", "status": "Pending"} for i in range(threads * ops_per_thread))
+            for workload in ("disjoint", "overlapping"):
+                def worker(worker_id):
+                    rng = random.Random(worker_id)
+                    for i in range(ops_per_thread):
+                        # disjoint: each thread owns its titles; overlapping: all threads share 8 hot titles
+                        task = worker_id * ops_per_thread + i if workload == "disjoint" else rng.randrange(8)
+                        system.update_task(f"Task {task}", status="In Progress")
+
+                workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+                start = time.perf_counter()
+                for worker_thread in workers:
+                    worker_thread.start()
+                for worker_thread in workers:
+                    worker_thread.join()
+                elapsed = time.perf_counter() - start
+                print(f"{name:>8} {workload:>12} {threads * ops_per_thread / elapsed:>10,.0f}")
+
+            # Lock lookups alone for many distinct titles: memory and cost per lookup
+            start = time.perf_counter()
+            for i in range(titles):
+                with system._get_task_lock(f"Imported title {i}"):
+                    pass
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            for i in range(titles):
+                with system._get_task_lock(f"More titles {i}"):
+                    pass
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print(f"{name:>8} {titles:,} titles: {elapsed / titles * 1e9:.0f} ns/lookup, "
+                  f"{len(system.task_locks):,} locks, +{memory / 2**20:.1f} MiB per {titles:,} new titles")
+            system.db_manager.close()
+
+
+def benchmark_cache(tasks=50_000, hot=1_000, fetches=100_000, threads=8, writes_per_thread=300):
+    """get_task fetch rate on a hot set with and without the cache, and cache/database agreement under concurrent writers."""
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'cache':>8} {'fetches/s':>10} {'hit rate':>9}")
+        for name, cache_size in (("off", 0), ("on", 10_000)):
+            system = TaskManagementSystem(os.path.join(directory, f"cache-{name}.db"), cache_size=cache_size)
+            ids = system.create_tasks_bulk(_filter_page_tasks(tasks))
+            rng = random.Random(3)
+            hot_ids = rng.sample(ids, hot)
+            start = time.perf_counter()
+            for _ in range(fetches):
+                assert system.get_task(rng.choice(hot_ids)) is not None
+            elapsed = time.perf_counter() - start
+            stats = system.cache.stats()
+            hit_rate = stats["hits"] / max(stats["hits"] + stats["misses"], 1)
+            print(f"{name:>8} {fetches / elapsed:>10,.0f} {hit_rate:>9.1%}")
+            system.db_manager.close()
+
+        # Readers hammer a few hot titles while writers update and delete them;
+        # afterwards every cached task must match the database row
+        system = TaskManagementSystem(os.path.join(directory, "coherence.db"))
+        titles = [f"Hot task {i}" for i in range(16)]
+        for title in titles:
+            system.create_task(title, "", "2024-12-31", "Low", "Pending")
+        done = threading.Event()
+
+        def reader(seed):
+            rng = random.Random(seed)
+            while not done.is_set():
+                task = system.get_task_by_title(rng.choice(titles))
+                if task is not None:
+                    system.get_task(task.id)
+
+        def writer(seed):
+            rng = random.Random(seed)
+            for i in range(writes_per_thread):
+                title = rng.choice(titles)
+                if rng.random() < 0.1:
+                    system.delete_task(title)
+                    system.create_task(title, "", "2024-12-31", "Low", "Pending")
+                else:
+                    system.update_task(title, description=f"writer {seed} update {i}")
+
+        readers = [threading.Thread(target=reader, args=(t,)) for t in range(threads)]
+        writers = [threading.Thread(target=writer, args=(100 + t,)) for t in range(threads // 2)]
+        for worker_thread in readers + writers:
+            worker_thread.start()
+        for worker_thread in writers:
+            worker_thread.join()
+        done.set()
+        for worker_thread in readers:
+            worker_thread.join()
+
+        stale = 0
+        for title in titles:
+            cached = system.cache.get_by_title(title)
+            with system.db_manager.read_connection() as conn:
+                row = conn.execute(f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE title = ? ORDER BY id LIMIT 1",
+                                   (title,)).fetchone()
+            if cached is not None and (row is None or cached != row_to_task(row)):
+                stale += 1
+        stats = system.cache.stats()
+        assert stale == 0, f"{stale} stale cache entries"
+        print(f"coherence: {threads} readers, {threads // 2} writers, {stats['hits']:,} hits, "
+              f"{stats['misses']:,} misses, 0 stale entries")
+        system.db_manager.close()
+
+
+BENCHMARKS = {
+    "connection_pool": benchmark_connection_pool,
+    "bulk_import": benchmark_bulk_import,
+    "search": benchmark_search,
+    "task_locks": benchmark_task_locks,
+    "cache": benchmark_cache,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        print(f"\n== {name} ==")
+        BENCHMARKS[name]()
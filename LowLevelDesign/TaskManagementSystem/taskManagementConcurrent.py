@@ -1,10 +1,14 @@
 
 import threading
 import sqlite3
+import time
+from collections import OrderedDict
 from datetime import datetime
+from itertools import islice
 import json
-from typing import Optional, List, Dict
-from dataclasses import dataclass
+from queue import Empty, Queue
+from typing import Optional, List, Dict, Iterable, Tuple, Union
+from dataclasses import dataclass, replace
 import logging
 from contextlib import contextmanager
 
@@ -43,33 +47,123 @@ class Task:
             'updated_at': self.updated_at
         }
 
+@dataclass
+class TaskQuery:
+    """
+    Typed filter for TaskManagementSystem.query_tasks.
+
+    priority, status and assignee are exact matches. due_from/due_to bound
+    due_date as [due_from, due_to) in the same ISO text format it is stored
+    in. text is a free-text search over title and description; every word
+    must appear. Results are ordered by (due_date, id), with tasks that have
+    no due date first. Pass the returned cursor as after to get the next page.
+    """
+    priority: Optional[str] = None
+    status: Optional[str] = None
+    assignee: Optional[str] = None
+    due_from: Optional[str] = None
+    due_to: Optional[str] = None
+    text: Optional[str] = None
+    limit: Optional[int] = 50
+    after: Optional[Tuple[Optional[str], int]] = None
+
+TASK_COLUMNS = ('id', 'title', 'description', 'due_date', 'priority', 'status',
+                'assignee', 'reminder', 'created_at', 'updated_at')
+
+def row_to_task(row) -> Task:
+    """Build a Task from a row selected as TASK_COLUMNS."""
+    return Task(**dict(zip(TASK_COLUMNS, row)))
+
 class DatabaseManager:
     """
     Handles all database operations with proper connection management
     and error handling.
+
+    The database runs in WAL mode, so readers never block the writer and
+    the writer never blocks readers. SQLite allows one writer at a time, so
+    writes share a single long-lived connection behind write_lock, while
+    reads borrow one of up to pool_size reader connections. Connections
+    stay open, so each one keeps its prepared-statement cache
+    (cached_statements) across operations.
     """
-    def __init__(self, db_path: str = "tasks.db"):
+    PRAGMAS = (
+        "PRAGMA synchronous = NORMAL",   # WAL is still crash-safe; fsync only at checkpoints
+        "PRAGMA busy_timeout = 5000",
+        "PRAGMA cache_size = -16000",    # 16 MB page cache per connection
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA mmap_size = 268435456",  # read pages through a 256 MB mmap
+    )
+
+    def __init__(self, db_path: str = "tasks.db", pool_size: int = 8, cached_statements: int = 256):
         self.db_path = db_path
-        self.connection_lock = threading.Lock()
+        self.pool_size = pool_size
+        self.cached_statements = cached_statements
+        self.write_lock = threading.Lock()
+        self.readers = Queue()
+        self.reader_count = 0
+        self.pool_lock = threading.Lock()
+        self.writer = self._connect()
+        self.writer.execute("PRAGMA journal_mode = WAL")
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transactions are opened explicitly below, and
+        # reads run in autocommit so each sees the latest committed snapshot
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
     @contextmanager
     def get_connection(self):
         """
-        Context manager for database connections to ensure proper handling
-        of concurrent access and resource cleanup.
+        Context manager for a write transaction on the single writer
+        connection. The transaction commits on success and rolls back on
+        error. BEGIN IMMEDIATE takes SQLite's write lock up front, so it
+        cannot fail halfway on a lock upgrade.
         """
-        with self.connection_lock:
-            conn = sqlite3.connect(self.db_path)
+        with self.write_lock:
+            conn = self.writer
+            conn.execute("BEGIN IMMEDIATE")
             try:
                 yield conn
-                conn.commit()
+                conn.execute("COMMIT")
             except Exception as e:
-                conn.rollback()
+                conn.execute("ROLLBACK")
                 logger.error(f"Database error: {e}")
                 raise
-            finally:
-                conn.close()
+
+    @contextmanager
+    def read_connection(self):
+        """
+        Context manager that borrows a reader connection from the pool.
+        Readers run concurrently with each other and with the writer. A new
+        connection is opened while fewer than pool_size exist; after that,
+        callers wait for one to be returned.
+        """
+        try:
+            conn = self.readers.get_nowait()
+        except Empty:
+            with self.pool_lock:
+                grow = self.reader_count < self.pool_size
+                if grow:
+                    self.reader_count += 1
+            conn = self._connect() if grow else self.readers.get()
+        try:
+            yield conn
+        finally:
+            self.readers.put(conn)
+
+    def close(self):
+        """Close the writer and every idle reader connection."""
+        with self.write_lock:
+            self.writer.close()
+        while True:
+            try:
+                self.readers.get_nowait().close()
+            except Empty:
+                break
 
     def _init_db(self):
         """Initialize database with required tables"""
@@ -87,32 +181,160 @@ class DatabaseManager:
             updated_at TEXT
         );
         CREATE INDEX IF NOT EXISTS idx_task_title ON tasks(title);
+
+        -- Composite indexes for the filter page: equality columns first, then
+        -- due_date so ranges and ORDER BY due_date, id come from the index
+        -- (every index ends in the rowid, which is id)
+        CREATE INDEX IF NOT EXISTS idx_task_due ON tasks(due_date);
+        CREATE INDEX IF NOT EXISTS idx_task_status_due ON tasks(status, due_date);
+        CREATE INDEX IF NOT EXISTS idx_task_priority_status_due ON tasks(priority, status, due_date);
+        CREATE INDEX IF NOT EXISTS idx_task_assignee_status_due ON tasks(assignee, status, due_date);
+
+        -- Full-text index over title and description, kept in sync by triggers
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description, content='tasks', content_rowid='id');
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END;
         '''
-        with self.get_connection() as conn:
-            conn.executescript(create_table_sql)
+        fts_objects = ('tasks_fts', 'tasks_fts_insert', 'tasks_fts_delete', 'tasks_fts_update')
+        with self.write_lock:
+            existing = self.writer.execute(
+                f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join('?' * len(fts_objects))})",
+                fts_objects).fetchone()[0]
+            self.writer.executescript(create_table_sql)
+            if existing < len(fts_objects):
+                # Rows were written while tasks_fts or a trigger was missing: a
+                # database created before tasks_fts existed, or a deferred bulk
+                # import that crashed before restoring the triggers
+                self.writer.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+class TaskCache:
+    """
+    In-process LRU cache of Task objects by id, with a title -> ids index
+    for lookups and invalidation by title. Entries expire after ttl seconds
+    and the least recently used ones are evicted beyond max_size. Callers
+    get copies, so mutating a returned Task never changes the cache.
+
+    Coherence with concurrent writers: a writer calls invalidate_title
+    after its transaction commits, and every invalidation bumps epoch. A
+    reader takes the epoch before its database read and only fills the
+    cache if no invalidation happened in between. A read that raced a
+    write can therefore never store the pre-write row.
+    """
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: "OrderedDict[int, Tuple[Task, float]]" = OrderedDict()
+        self.title_ids: Dict[str, set] = {}
+        self.title_heads: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, task_id: int) -> Optional[Task]:
+        with self.lock:
+            entry = self.entries.get(task_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self.entries.move_to_end(task_id)
+                self.hits += 1
+                return replace(entry[0])
+            if entry is not None:
+                self._remove(task_id)
+            self.misses += 1
+            return None
+
+    def get_by_title(self, title: str) -> Optional[Task]:
+        # Only a title lookup records which task answers it (the lowest id
+        # with that title), so a task cached by id alone is not enough here
+        task_id = self.title_heads.get(title)
+        if task_id is None:
+            with self.lock:
+                self.misses += 1
+            return None
+        return self.get(task_id)
+
+    def put(self, task: Task, epoch: int, title_head: bool = False):
+        """Store a task read at epoch, unless it was invalidated since."""
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            if epoch != self.epoch:
+                return
+            if task.id in self.entries:
+                self._remove(task.id)
+            self.entries[task.id] = (replace(task), time.monotonic() + self.ttl)
+            self.title_ids.setdefault(task.title, set()).add(task.id)
+            if title_head:
+                self.title_heads[task.title] = task.id
+            while len(self.entries) > self.max_size:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate_title(self, title: str):
+        with self.lock:
+            self.epoch += 1
+            for task_id in list(self.title_ids.get(title, ())):
+                self._remove(task_id)
+            self.title_heads.pop(title, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self.lock:
+            self.epoch += 1
+            self.entries.clear()
+            self.title_ids.clear()
+            self.title_heads.clear()
+
+    def _remove(self, task_id: int):
+        task, _ = self.entries.pop(task_id)
+        ids = self.title_ids.get(task.title)
+        if ids is not None:
+            ids.discard(task_id)
+            if not ids:
+                del self.title_ids[task.title]
+                self.title_heads.pop(task.title, None)
+        if self.title_heads.get(task.title) == task_id:
+            del self.title_heads[task.title]
 
 class TaskManagementSystem:
     """
     Enhanced Task Management System with concurrent access handling
     and data persistence.
     """
-    def __init__(self, db_path: str = "tasks.db"):
+    def __init__(self, db_path: str = "tasks.db", lock_stripes: int = 256,
+                 cache_size: int = 10000, cache_ttl: float = 300.0):
         """
         Initialize the Task Management System with the given database path.
 
         Args:
             db_path (str): The path to the SQLite database file.
+            lock_stripes (int): Number of locks in the striped task lock table.
+            cache_size (int): Most tasks kept by the read-through cache (0 disables it).
+            cache_ttl (float): Seconds a cached task stays valid.
         """
         self.db_manager = DatabaseManager(db_path)
-        self.task_locks: Dict[str, threading.Lock] = {}  # Mapping of task titles to locks
-        self.global_lock = threading.Lock()  # Global lock for concurrent access control
+        self.cache = TaskCache(cache_size, cache_ttl)
+        # Fixed-size striped lock table: a title always maps to the same lock,
+        # memory does not grow with the number of titles, and picking a lock
+        # needs no shared mutex. Two titles on one stripe only share a lock.
+        self.task_locks: List[threading.Lock] = [threading.Lock() for _ in range(lock_stripes)]
 
     def _get_task_lock(self, title: str) -> threading.Lock:
-        """Get or create a lock for a specific task"""
-        with self.global_lock:
-            if title not in self.task_locks:
-                self.task_locks[title] = threading.Lock()
-            return self.task_locks[title]
+        """Get the lock stripe for a specific task"""
+        return self.task_locks[hash(title) % len(self.task_locks)]
 
     def create_task(self, title: str, description: str, due_date: str, 
                    priority: str, status: str) -> Optional[Task]:
@@ -145,8 +367,78 @@ class TaskManagementSystem:
                 logger.error(f"Task creation failed: {e}")
                 return None
 
+    BULK_COLUMNS = ('title', 'description', 'due_date', 'priority', 'status',
+                    'assignee', 'reminder', 'created_at', 'updated_at')
+
+    def create_tasks_bulk(self, tasks: Iterable[Union[Task, dict]], batch_size: int = 50000,
+                          defer_indexes: bool = True) -> List[int]:
+        """
+        Insert many tasks (Task objects or dicts with Task's fields) and
+        return their ids in input order.
+
+        tasks is consumed batch_size rows at a time, so a generator over a
+        huge import never sits in memory. Each batch is one executemany in
+        one transaction. The ids of a batch are contiguous, because a single
+        writer holds the transaction, so they come from last_insert_rowid()
+        rather than a query per row.
+
+        With defer_indexes the secondary indexes on tasks and the full-text
+        triggers are dropped for the import. At the end the indexes are
+        rebuilt once and the full-text index is rebuilt from the table,
+        instead of both being updated row by row. Readers fall back to table
+        scans until then. If the process dies mid-import, the next
+        DatabaseManager finds the triggers missing and restores the indexes
+        and the full-text index itself. Per-title locks are not taken: bulk
+        rows are new tasks.
+        """
+        indexes = self._drop_indexes() if defer_indexes else []
+        ids: List[int] = []
+        iterator = iter(tasks)
+        try:
+            while True:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    break
+                current_time = datetime.now().isoformat()
+                rows = [self._bulk_row(task, current_time) for task in batch]
+                with self.db_manager.get_connection() as conn:
+                    conn.executemany(f'''
+                        INSERT INTO tasks ({", ".join(self.BULK_COLUMNS)})
+                        VALUES ({", ".join("?" * len(self.BULK_COLUMNS))})
+                    ''', rows)
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                ids.extend(range(last_id - len(rows) + 1, last_id + 1))
+        finally:
+            self._restore_indexes(indexes)
+        return ids
+
+    def _bulk_row(self, task: Union[Task, dict], current_time: str) -> tuple:
+        values = task.to_dict() if isinstance(task, Task) else task
+        return (values['title'], values.get('description'), values.get('due_date'),
+                values.get('priority'), values.get('status'), values.get('assignee'),
+                values.get('reminder'), values.get('created_at') or current_time,
+                values.get('updated_at') or current_time)
+
+    def _drop_indexes(self) -> List[Tuple[str, str]]:
+        """Drop the secondary indexes and triggers on tasks; return their (type, CREATE statement)."""
+        with self.db_manager.get_connection() as conn:
+            objects = conn.execute(
+                "SELECT type, name, sql FROM sqlite_master "
+                "WHERE type IN ('index', 'trigger') AND tbl_name = 'tasks' AND sql IS NOT NULL").fetchall()
+            for object_type, name, _ in objects:
+                conn.execute(f"DROP {object_type.upper()} {name}")
+        return [(object_type, sql) for object_type, _, sql in objects]
+
+    def _restore_indexes(self, objects: List[Tuple[str, str]]):
+        if objects:
+            with self.db_manager.get_connection() as conn:
+                for _, sql in objects:
+                    conn.execute(sql)
+                if any(object_type == 'trigger' for object_type, _ in objects):
+                    conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
     def update_task(self, title: str, **kwargs) -> Optional[Task]:
-        """Update task with optimistic locking"""
+        """Update task while holding its title's stripe lock"""
         task_lock = self._get_task_lock(title)
         with task_lock:
             try:
@@ -176,34 +468,127 @@ class TaskManagementSystem:
                     
                     # Fetch updated task
                     cursor.execute(
-                        "SELECT * FROM tasks WHERE title = ?", (title,))
+                        f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE title = ?", (title,))
                     task_data = cursor.fetchone()
-                    return Task(*task_data[1:]) if task_data else None
+                # Committed: drop cached copies before the title lock is released
+                self.cache.invalidate_title(title)
+                return row_to_task(task_data) if task_data else None
                     
             except sqlite3.Error as e:
                 logger.error(f"Task update failed: {e}")
                 return None
 
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Fetch a task by id, served from the cache when possible"""
+        task = self.cache.get(task_id)
+        if task is None:
+            epoch = self.cache.epoch
+            with self.db_manager.read_connection() as conn:
+                row = conn.execute(
+                    f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            if row is None:
+                return None
+            task = row_to_task(row)
+            self.cache.put(task, epoch)
+        return task
+
+    def get_task_by_title(self, title: str) -> Optional[Task]:
+        """Fetch the first task with a title, served from the cache when possible"""
+        task = self.cache.get_by_title(title)
+        if task is None:
+            epoch = self.cache.epoch
+            with self.db_manager.read_connection() as conn:
+                row = conn.execute(
+                    f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE title = ? ORDER BY id LIMIT 1",
+                    (title,)).fetchone()
+            if row is None:
+                return None
+            task = row_to_task(row)
+            self.cache.put(task, epoch, title_head=True)
+        return task
+
     def search_tasks(self, criteria: Dict[str, str]) -> List[Task]:
-        """Search tasks with criteria"""
-        try:
-            conditions = []
-            values = []
-            for field, value in criteria.items():
-                conditions.append(f"{field} LIKE ?")
-                values.append(f"%{value}%")
+        """
+        Search tasks with criteria. priority, status, assignee and due_date
+        match exactly; title and description values are full-text searched
+        (every word must appear). Returns every match; use query_tasks for
+        pages.
+        """
+        query = TaskQuery(limit=None)
+        words = []
+        for field, value in criteria.items():
+            if field in ('priority', 'status', 'assignee'):
+                setattr(query, field, value)
+            elif field == 'due_date':
+                # One exact value: [value, value + "\0") in text order
+                query.due_from, query.due_to = value, value + "\0"
+            elif field in ('title', 'description'):
+                words.append(value)
+            else:
+                logger.error(f"Task search failed: unknown field {field!r}")
+                return []
+        query.text = " ".join(words) or None
+        return self.query_tasks(query)[0]
 
-            with self.db_manager.get_connection() as conn:
-                cursor = conn.cursor()
-                query = f'''
-                    SELECT * FROM tasks 
-                    WHERE {" AND ".join(conditions)}
-                '''
-                cursor.execute(query, values)
-                return [Task(*row[1:]) for row in cursor.fetchall()]
+    def _build_query(self, query: TaskQuery, columns: str) -> Tuple[str, list]:
+        conditions = []
+        values = []
+        for field in ('priority', 'status', 'assignee'):
+            value = getattr(query, field)
+            if value is not None:
+                conditions.append(f"{field} = ?")
+                values.append(value)
+        if query.due_from is not None:
+            conditions.append("due_date >= ?")
+            values.append(query.due_from)
+        if query.due_to is not None:
+            conditions.append("due_date < ?")
+            values.append(query.due_to)
+        if query.text:
+            # Quote every word so user input cannot inject FTS5 query syntax
+            match = " ".join('"' + word.replace('"', '""') + '"' for word in query.text.split())
+            conditions.append("id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)")
+            values.append(match)
+        if query.after is not None:
+            # Keyset pagination on (due_date, id); NULL due dates sort first
+            after_due, after_id = query.after
+            if after_due is None:
+                conditions.append("((due_date IS NULL AND id > ?) OR due_date IS NOT NULL)")
+                values.append(after_id)
+            else:
+                conditions.append("(due_date, id) > (?, ?)")
+                values.extend([after_due, after_id])
+        sql = f"SELECT {columns} FROM tasks"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY due_date, id"
+        if query.limit is not None:
+            sql += " LIMIT ?"
+            values.append(query.limit)
+        return sql, values
+
+    def query_tasks(self, query: TaskQuery) -> Tuple[List[Task], Optional[Tuple[Optional[str], int]]]:
+        """
+        Run a TaskQuery. Returns (tasks, cursor); cursor is None on the last
+        page, otherwise pass it as TaskQuery.after to continue.
+        """
+        sql, values = self._build_query(query, ", ".join(TASK_COLUMNS))
+        try:
+            with self.db_manager.read_connection() as conn:
+                tasks = [row_to_task(row) for row in conn.execute(sql, values)]
         except sqlite3.Error as e:
             logger.error(f"Task search failed: {e}")
-            return []
+            return [], None
+        cursor = None
+        if query.limit is not None and len(tasks) == query.limit:
+            cursor = (tasks[-1].due_date, tasks[-1].id)
+        return tasks, cursor
+
+    def explain_query(self, query: TaskQuery) -> List[str]:
+        """The EXPLAIN QUERY PLAN details SQLite would use for a TaskQuery."""
+        sql, values = self._build_query(query, ", ".join(TASK_COLUMNS))
+        with self.db_manager.read_connection() as conn:
+            return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, values)]
 
     def delete_task(self, title: str) -> bool:
         """Delete a task with proper locking"""
@@ -213,7 +598,9 @@ class TaskManagementSystem:
                 with self.db_manager.get_connection() as conn:
                     cursor = conn.cursor()
                     cursor.execute("DELETE FROM tasks WHERE title = ?", (title,))
-                    return cursor.rowcount > 0
+                    deleted = cursor.rowcount > 0
+                self.cache.invalidate_title(title)
+                return deleted
             except sqlite3.Error as e:
                 logger.error(f"Task deletion failed: {e}")
                 return False
@@ -250,15 +637,16 @@ if __name__ == "__main__":
 
 
 # 1. Concurrency Control:
-#    - Implemented a multi-level locking system with both global and per-task locks
+#    - Implemented a striped per-task lock table (fixed size, no global lock)
 #    - Used context managers to ensure proper resource cleanup
-#    - Added optimistic locking for updates to prevent lost updates
-#    - Implemented thread-safe database connections
+#    - Serialized updates to a task under its stripe lock to prevent lost updates
+#    - One writer connection behind a lock (BEGIN IMMEDIATE transactions) and
+#      a pool of reader connections that never block it
 
 # 2. Data Persistence:
 #    - Added SQLite database storage with proper schema
-#    - Implemented connection pooling and management
-#    - Added indexes for better query performance
+#    - Implemented connection pooling (one WAL writer, pooled readers)
+#    - Added composite indexes, FTS5 full-text search and keyset pagination
 #    - Included proper error handling and rollback mechanisms
 
 # 3. Data Integrity:
@@ -277,6 +665,7 @@ if __name__ == "__main__":
 #    - Used connection pooling to reduce database overhead
 #    - Implemented proper indexing for faster searches
 #    - Added efficient locking mechanisms to minimize contention
+#    - Added a read-through LRU task cache, invalidated on every committed write
 #    - Used prepared statements to prevent SQL injection
 
 # The key improvements provide several benefits: